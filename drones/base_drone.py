@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class BaseDrone(ABC):
     """无人机抽象基类，定义统一接口"""
@@ -78,6 +79,18 @@ class BaseDrone(ABC):
         """获取电池状态"""
         pass
     
+    def get_mode(self) -> Optional[str]:
+        """获取飞行模式，不支持时返回None"""
+        return None
+    
+    def is_armed(self) -> Optional[bool]:
+        """获取解锁状态，不支持时返回None"""
+        return None
+    
+    def get_last_heartbeat(self) -> Optional[float]:
+        """最近一次心跳的时间戳(time.time())，不支持时返回None"""
+        return None
+    
     @abstractmethod
     def end(self) -> None:
         """断开连接"""
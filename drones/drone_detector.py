@@ -1,30 +1,135 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
-from .tello_drone import TelloDrone
-from .px4_drone import PX4Drone
 from .base_drone import BaseDrone
+from .registry import get_backend, get_backends
+
+DEFAULT_PX4_CONNECTION_STRING = "udp:127.0.0.1:14550"
+# 上次成功连接的后端和连接字符串，下次启动时优先尝试
+DRONE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".gesture_control", "last_drone.json")
+
+
+def load_cached_backend(cache_path: str = DRONE_CACHE_PATH) -> Optional[dict]:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached if isinstance(cached, dict) and "backend" in cached else None
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_backend(backend: str, connection_string: str, cache_path: str = DRONE_CACHE_PATH) -> None:
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"backend": backend, "connection_string": connection_string}, f)
+    except OSError as e:
+        print(f"保存无人机连接缓存失败: {e}")
+
 
 class DroneDetector:
     @staticmethod
-    def detect_and_connect(px4_connection_string: Optional[str] = None) -> BaseDrone:
-        """自动识别并连接无人机，返回实例"""
-        # 如果没有指定PX4连接字符串，使用默认值
+    def detect_and_connect(px4_connection_string: Optional[str] = None, probes=None,
+                           cache_path: Optional[str] = DRONE_CACHE_PATH,
+                           head_start: float = 1.0, backend: Optional[str] = None) -> BaseDrone:
+        """自动识别并连接无人机，返回实例
+
+        probes为[(后端名, probe(connection_string))]，默认取drones.registry中注册的后端。
+        指定backend时只探测该后端，其余后端的模块和SDK都不会被导入。
+
+        所有后端并行握手，最先成功的胜出；其余探测结束后若也连上了会被断开。
+        上次成功的后端先启动，其余后端最多等待head_start秒后再开始。
+        cache_path为None时不读写缓存。
+        """
+        if backend is not None:
+            selected = get_backend(backend)
+            if selected is None:
+                names = ", ".join(item.name for item in get_backends())
+                print(f"未知的无人机后端: {backend} (可用: {names})")
+                return None
+            probes = [(selected.name, selected.probe)]
+        elif probes is None:
+            # 探测函数在线程里才导入后端模块
+            probes = [(item.name, item.probe) for item in get_backends()]
+        probes = list(probes)
+        cached = load_cached_backend(cache_path) if cache_path else None
+
+        # 如果没有指定PX4连接字符串，优先使用上次成功的，否则使用默认值
         if px4_connection_string is None:
-            px4_connection_string = "udp:127.0.0.1:14550"
-
-        # 1. 尝试连接Tello
-        print("尝试连接Tello无人机...")
-        tello = TelloDrone()
-        if tello.connect():
-            print("成功连接Tello无人机")
-            return tello
-
-        # 2. 尝试连接PX4
-        print(f"尝试连接PX4飞控... (连接字符串: {px4_connection_string})")
-        px4 = PX4Drone(px4_connection_string)
-        if px4.connect():
-            print("成功连接PX4飞控")
-            return px4
-
-        # 3. 连接失败
-        print("未识别到支持的无人机类型")
-        return None
\ No newline at end of file
+            if cached and cached.get("connection_string"):
+                px4_connection_string = cached["connection_string"]
+            else:
+                px4_connection_string = DEFAULT_PX4_CONNECTION_STRING
+
+        cached_name = cached["backend"] if cached else None
+        if cached_name in [name for name, _ in probes]:
+            probes.sort(key=lambda probe: probe[0] != cached_name)
+            print(f"优先尝试上次连接的无人机: {cached_name}")
+        else:
+            cached_name = None
+
+        winner_lock = threading.Lock()
+        winner = {}
+        head_start_done = threading.Event()
+        if cached_name is None:
+            head_start_done.set()
+
+        def probe(name, probe_func):
+            if name != cached_name:
+                head_start_done.wait(head_start)
+            if "drone" in winner:
+                return None
+
+            print(f"尝试连接{name}无人机...")
+            try:
+                drone = probe_func(px4_connection_string)
+            except Exception as e:
+                print(f"{name}探测失败: {e}")
+                drone = None
+            finally:
+                if name == cached_name:
+                    head_start_done.set()
+
+            if drone is None:
+                return None
+
+            with winner_lock:
+                if "drone" not in winner:
+                    winner["drone"] = drone
+                    winner["name"] = name
+                    return drone
+            # 已有其他后端胜出，晚到的连接直接断开
+            print(f"{name}连接晚于已选后端，断开")
+            _close(drone)
+            return None
+
+        executor = ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="drone-probe")
+        futures = [executor.submit(probe, name, probe_func) for name, probe_func in probes]
+        try:
+            for future in as_completed(futures):
+                if future.result() is not None:
+                    break
+        finally:
+            head_start_done.set()
+            for future in futures:
+                future.cancel()
+            # 不等待仍在握手的探测，它们结束后自行清理
+            executor.shutdown(wait=False)
+
+        if "drone" not in winner:
+            print("未识别到支持的无人机类型")
+            return None
+
+        print(f"成功连接{winner['name']}无人机")
+        if cache_path:
+            save_cached_backend(winner["name"], px4_connection_string, cache_path)
+        return winner["drone"]
+
+
+def _close(drone: BaseDrone) -> None:
+    try:
+        drone.end()
+    except Exception as e:
+        print(f"断开无人机失败: {e}")
@@ -0,0 +1,84 @@
+import time
+import threading
+from typing import Optional, Tuple
+
+
+class FrameReader:
+    """统一的视频帧读取对象，为每一帧附带序号和采集时间
+
+    支持两种帧源：
+    - 带frame属性的后台读取对象（djitellopy的BackgroundFrameRead），
+      帧对象发生变化时视为新帧；
+    - 带read()方法的cv.VideoCapture，由后台线程持续读取。
+    时间戳使用time.monotonic()，序号从1开始递增，0表示还没有帧。
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.seq = 0
+        self.timestamp = 0.0
+        self._frame = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+        if not hasattr(source, 'frame'):
+            self._thread = threading.Thread(target=self._capture_loop, name='frame-reader')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _capture_loop(self):
+        while not self._stopped:
+            ok, frame = self.source.read()
+            if not ok:
+                time.sleep(0.01)
+                continue
+            self._publish(frame)
+
+    def _publish(self, frame):
+        with self._cond:
+            self._frame = frame
+            self.seq += 1
+            self.timestamp = time.monotonic()
+            self._cond.notify_all()
+
+    def _poll_source(self):
+        # BackgroundFrameRead在后台线程中替换frame对象，首次看到新对象时记为新帧
+        frame = self.source.frame
+        if frame is not None and frame is not self._frame:
+            self._publish(frame)
+
+    @property
+    def frame(self):
+        """最新一帧，兼容BackgroundFrameRead.frame"""
+        return self.read()[2]
+
+    def read(self) -> Tuple[int, float, object]:
+        """返回最新帧的(序号, 采集时间, 图像)"""
+        if self._thread is None:
+            self._poll_source()
+        with self._cond:
+            return self.seq, self.timestamp, self._frame
+
+    def wait_for_new(self, last_seq: int, timeout: float = 0.1):
+        """等待序号大于last_seq的新帧，超时返回None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            seq, timestamp, frame = self.read()
+            if seq > last_seq:
+                return seq, timestamp, frame
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._thread is None:
+                time.sleep(min(0.002, remaining))
+            else:
+                with self._cond:
+                    if self.seq <= last_seq:
+                        self._cond.wait(remaining)
+
+    def stop(self) -> None:
+        """停止后台读取线程（不释放底层帧源）"""
+        self._stopped = True
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
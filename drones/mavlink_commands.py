@@ -0,0 +1,145 @@
+import threading
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Optional
+
+# MAV_RESULT
+MAV_RESULT_ACCEPTED = 0
+MAV_RESULT_TEMPORARILY_REJECTED = 1
+MAV_RESULT_IN_PROGRESS = 5
+# 切换模式用MAV_CMD_DO_SET_MODE发送，PX4也用它回复SET_MODE消息；
+# 部分飞控对SET_MODE消息回复的command是消息ID，按同一个命令处理
+MAV_CMD_DO_SET_MODE = 176
+MAVLINK_MSG_ID_SET_MODE = 11
+_ACK_ALIASES = {MAVLINK_MSG_ID_SET_MODE: MAV_CMD_DO_SET_MODE}
+
+
+class CommandRejected(Exception):
+    def __init__(self, command: int, result: int):
+        super().__init__(f"命令 {command} 被拒绝 (MAV_RESULT={result})")
+        self.command = command
+        self.result = result
+
+
+class _Pending:
+    def __init__(self, key, send_attempt, timeout, retries, mode):
+        self.key = key
+        self.send_attempt = send_attempt
+        self.timeout = timeout
+        self.retries = retries
+        self.mode = mode
+        self.attempt = 0
+        self.timer: Optional[threading.Timer] = None
+        self.future = Future()
+
+
+class CommandTracker:
+    """把命令和COMMAND_ACK对应起来，每个命令返回一个Future
+
+    on_ack/on_mode由MAVLink接收线程调用。命令在timeout内没有回复则重发，
+    重发retries次后以TimeoutError结束；被拒绝时以CommandRejected结束，
+    TEMPORARILY_REJECTED会重试。切换模式的Future在收到对应ACK或心跳中的
+    模式变为目标模式时完成。同一命令同时只跟踪一个，新的会取消旧的。
+    """
+
+    def __init__(self, timeout: float = 1.0, retries: int = 2):
+        self.timeout = timeout
+        self.retries = retries
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: int, send_attempt: Callable[[int], None], timeout: Optional[float] = None,
+               retries: Optional[int] = None, mode: Optional[str] = None) -> Future:
+        """发送命令并返回Future
+
+        Args:
+            key: COMMAND_ACK中的command，切换模式为MAV_CMD_DO_SET_MODE
+            send_attempt: send_attempt(attempt)发送一次，attempt从0开始，可作为confirmation
+            mode: 切换模式时心跳中的目标模式名（如PX4的"LOITER"），心跳中出现该模式即完成
+        """
+        pending = _Pending(key, send_attempt,
+                           self.timeout if timeout is None else timeout,
+                           self.retries if retries is None else retries, mode)
+        with self._lock:
+            previous = self._pending.get(key)
+            self._pending[key] = pending
+        if previous is not None:
+            self._finish(previous, cancel=True)
+
+        self._send(pending)
+        return pending.future
+
+    def on_ack(self, msg) -> None:
+        with self._lock:
+            pending = self._pending.get(_ACK_ALIASES.get(msg.command, msg.command))
+        if pending is None:
+            return
+
+        if msg.result == MAV_RESULT_ACCEPTED:
+            self._finish(pending, result=msg.result)
+        elif msg.result == MAV_RESULT_IN_PROGRESS:
+            # 命令仍在执行，重新计时但不重发
+            self._arm_timer(pending)
+        elif msg.result == MAV_RESULT_TEMPORARILY_REJECTED and pending.attempt <= pending.retries:
+            self._cancel_timer(pending)
+            self._send(pending)
+        else:
+            self._finish(pending, error=CommandRejected(pending.key, msg.result))
+
+    def on_mode(self, mode: str) -> None:
+        with self._lock:
+            pending = self._pending.get(MAV_CMD_DO_SET_MODE)
+        if pending is not None and pending.mode == mode:
+            self._finish(pending, result=MAV_RESULT_ACCEPTED)
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            pending = list(self._pending.values())
+        for item in pending:
+            self._finish(item, cancel=True)
+
+    def _send(self, pending: _Pending):
+        attempt = pending.attempt
+        pending.attempt += 1
+        try:
+            pending.send_attempt(attempt)
+        except Exception as e:
+            self._finish(pending, error=e)
+            return
+        self._arm_timer(pending)
+
+    def _arm_timer(self, pending: _Pending):
+        self._cancel_timer(pending)
+        pending.timer = threading.Timer(pending.timeout, self._on_timeout, (pending,))
+        pending.timer.daemon = True
+        pending.timer.start()
+
+    @staticmethod
+    def _cancel_timer(pending: _Pending):
+        if pending.timer is not None:
+            pending.timer.cancel()
+            pending.timer = None
+
+    def _on_timeout(self, pending: _Pending):
+        if pending.future.done():
+            return
+        if pending.attempt <= pending.retries:
+            self._send(pending)
+        else:
+            self._finish(pending, error=TimeoutError(
+                f"命令 {pending.key} 在 {pending.attempt} 次尝试后仍无回复"))
+
+    def _finish(self, pending: _Pending, result=None, error=None, cancel=False):
+        self._cancel_timer(pending)
+        with self._lock:
+            if self._pending.get(pending.key) is pending:
+                del self._pending[pending.key]
+        try:
+            if cancel:
+                pending.future.cancel()
+            elif error is not None:
+                pending.future.set_exception(error)
+            else:
+                pending.future.set_result(result)
+        except InvalidStateError:
+            # ACK和超时同时到达，先到的生效
+            pass
@@ -0,0 +1,85 @@
+import time
+import threading
+from collections import defaultdict
+from typing import Callable, Optional
+
+
+class MavlinkReceiver:
+    """MAVLink连接上唯一的接收线程
+
+    阻塞读取所有消息，每条只读一次，按类型存入最新值缓存并调用该类型的回调。
+    其他线程只读缓存，不再调用recv_match，避免争抢同一个连接。
+    回调在接收线程中执行，应尽快返回；类型"*"的回调接收所有消息。
+    """
+
+    def __init__(self, master, recv_timeout: float = 1.0, on_tick: Optional[Callable[[], None]] = None):
+        self.master = master
+        # recv_match阻塞等待的上限，也是on_tick最长的调用间隔
+        self.recv_timeout = recv_timeout
+        self.on_tick = on_tick
+        self._latest = {}
+        self._received_at = {}
+        self._callbacks = defaultdict(list)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="mavlink-recv", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def add_callback(self, msg_type: str, callback: Callable) -> None:
+        with self._lock:
+            self._callbacks[msg_type].append(callback)
+
+    def remove_callback(self, msg_type: str, callback: Callable) -> None:
+        with self._lock:
+            if callback in self._callbacks.get(msg_type, []):
+                self._callbacks[msg_type].remove(callback)
+
+    def get(self, msg_type: str):
+        """最近一条该类型的消息，没有收到过返回None"""
+        return self._latest.get(msg_type)
+
+    def age(self, msg_type: str) -> Optional[float]:
+        """距最近一条该类型消息的秒数"""
+        received_at = self._received_at.get(msg_type)
+        return None if received_at is None else time.monotonic() - received_at
+
+    def dispatch(self, msg) -> None:
+        """缓存消息并调用回调；connect时也用于放入wait_heartbeat拿到的心跳"""
+        msg_type = msg.get_type()
+        if msg_type == "BAD_DATA":
+            return
+        self._latest[msg_type] = msg
+        self._received_at[msg_type] = time.monotonic()
+        with self._lock:
+            callbacks = self._callbacks.get(msg_type, []) + self._callbacks.get("*", [])
+        for callback in callbacks:
+            try:
+                callback(msg)
+            except Exception as e:
+                print(f"MAVLink回调错误 ({msg_type}): {e}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                msg = self.master.recv_match(blocking=True, timeout=self.recv_timeout)
+                if msg is not None:
+                    self.dispatch(msg)
+                if self.on_tick is not None:
+                    self.on_tick()
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                print(f"MAVLink接收错误: {e}")
+                self._stop_event.wait(1)
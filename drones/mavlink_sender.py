@@ -0,0 +1,120 @@
+import time
+import threading
+from typing import Callable, Optional
+
+
+class MavlinkSender:
+    """固定频率的MAVLink发送线程
+
+    设定值（如RC覆盖）按名称保存，只保留最新一个，由发送线程以rate_hz发送；
+    两次发送之间的多次更新合并为一次，内容不变时只按keepalive间隔重发。
+    keepalive=0的设定值每个周期都发送，用于需要持续数据流的offboard设定值。
+    一次性命令用send()直接发送；降落、上锁、急停用send_priority()，
+    先清空待发设定值，再立即发送，不排在设定值后面。
+    所有发送共用一把锁，多个线程不会交错写入同一个连接。
+    """
+
+    def __init__(self, rate_hz: float = 20.0, keepalive: float = 0.5):
+        self.rate_hz = rate_hz
+        self.keepalive = keepalive
+        self._setpoints = {}
+        self._dirty = set()
+        self._last_sent = {}
+        self._keepalive = {}
+        # clear_setpoints()后递增，发送线程据此丢弃已取出的旧设定值
+        self._generation = 0
+        self._setpoint_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 统计：实际发出的设定值次数，以及被合并/去重省掉的更新次数
+        self.sent = 0
+        self.coalesced = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="mavlink-send", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def set_setpoint(self, key: str, send: Callable, *args, keepalive: Optional[float] = None) -> None:
+        """更新名为key的设定值，下一个发送周期生效；keepalive覆盖该设定值的重发间隔"""
+        with self._setpoint_lock:
+            if key in self._dirty:
+                self.coalesced += 1
+            self._setpoints[key] = (send, args)
+            self._dirty.add(key)
+            if keepalive is not None:
+                self._keepalive[key] = keepalive
+
+    def remove_setpoint(self, key: str) -> None:
+        """停止发送名为key的设定值"""
+        with self._setpoint_lock:
+            self._setpoints.pop(key, None)
+            self._dirty.discard(key)
+            self._last_sent.pop(key, None)
+
+    def clear_setpoints(self) -> None:
+        with self._setpoint_lock:
+            self._setpoints.clear()
+            self._dirty.clear()
+            self._last_sent.clear()
+            self._generation += 1
+
+    def send(self, send: Callable, *args) -> None:
+        """立即发送一次性命令"""
+        with self._send_lock:
+            send(*args)
+
+    def send_priority(self, send: Callable, *args) -> None:
+        """紧急命令：丢弃待发设定值后立即发送"""
+        self.clear_setpoints()
+        self.send(send, *args)
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            with self._setpoint_lock:
+                pending = dict(self._setpoints)
+                dirty = self._dirty
+                self._dirty = set()
+                generation = self._generation
+
+            now = time.monotonic()
+            for key, (send, args) in pending.items():
+                last = self._last_sent.get(key)
+                keepalive = self._keepalive.get(key, self.keepalive)
+                if last is not None and last[0] == args and now - last[1] < keepalive:
+                    # 与上次相同，等keepalive到期再重发
+                    if key in dirty:
+                        self.coalesced += 1
+                    continue
+
+                with self._send_lock:
+                    if generation != self._generation:
+                        # 期间有紧急命令清空了设定值
+                        break
+                    try:
+                        send(*args)
+                        self.sent += 1
+                    except Exception as e:
+                        print(f"MAVLink发送失败 ({key}): {e}")
+                with self._setpoint_lock:
+                    if generation == self._generation:
+                        self._last_sent[key] = (args, now)
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # 落后太多时不补发，从现在重新计时
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
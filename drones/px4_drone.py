@@ -1,7 +1,13 @@
+import math
 import time
 import threading
+from concurrent.futures import Future
 from typing import Optional
 from .base_drone import BaseDrone
+from .frame_reader import FrameReader
+from .mavlink_receiver import MavlinkReceiver
+from .mavlink_sender import MavlinkSender
+from .mavlink_commands import CommandTracker
 
 try:
     from pymavlink import mavutil
@@ -13,17 +19,51 @@ except ImportError:
 
 
 class PX4Drone(BaseDrone):
-    def __init__(self, connection_string: str = "udp:127.0.0.1:14550"):
+    # SET_POSITION_TARGET_LOCAL_NED只使用速度和偏航角速度
+    VELOCITY_TYPE_MASK = 0b010111000111
+    # PX4自定义主模式OFFBOARD
+    PX4_CUSTOM_MAIN_MODE_OFFBOARD = 6
+    # 模式名 -> (PX4自定义主模式, 子模式, 心跳中显示的模式名)
+    # PX4没有GUIDED模式，起飞前切换到AUTO.LOITER（悬停）
+    PX4_MODES = {
+        "MANUAL": (1, 0, "MANUAL"),
+        "GUIDED": (4, 3, "LOITER"),
+        "AUTO": (4, 4, "MISSION"),
+        "OFFBOARD": (PX4_CUSTOM_MAIN_MODE_OFFBOARD, 0, "OFFBOARD"),
+    }
+
+    def __init__(self, connection_string: str = "udp:127.0.0.1:14550", command_rate: float = 20.0,
+                 offboard: bool = False, max_speed: float = 1.0, max_yaw_rate: float = 45.0,
+                 command_timeout: float = 1.0, command_retries: int = 2):
         """
         初始化PX4无人机
         Args:
             connection_string: MAVLink连接字符串，如"udp:127.0.0.1:14550"或串口"COM3:57600"
+            command_rate: RC等设定值的固定发送频率(Hz)
+            offboard: 使用offboard速度设定值代替RC覆盖和command_long移动
+            max_speed: offboard下RC量100对应的速度(m/s)
+            max_yaw_rate: offboard下RC量100对应的偏航角速度(度/秒)
+            command_timeout: 等待COMMAND_ACK的超时(秒)，超时后重发
+            command_retries: 命令无回复时的重发次数
         """
         self.connected = False
         self.connection_string = connection_string
         self.master: Optional[mavlink_connection] = None
-        self.heartbeat_thread: Optional[threading.Thread] = None
-        self.stop_heartbeat = False
+        # 唯一的接收线程，遥测只从它的缓存读取
+        self.receiver: Optional[MavlinkReceiver] = None
+        # 所有出站消息经过发送线程，设定值按固定频率合并发送
+        self.command_rate = command_rate
+        self.sender = MavlinkSender(command_rate)
+        # 命令返回Future，由COMMAND_ACK或心跳中的模式变化完成
+        self.commands = CommandTracker(command_timeout, command_retries)
+        # offboard速度控制：控制器只更新目标速度，发送线程持续推送
+        self.offboard = offboard
+        self.max_speed = max_speed
+        self.max_yaw_rate = max_yaw_rate
+        self._velocity_target = (0.0, 0.0, 0.0, 0.0)
+        self._velocity_timer: Optional[threading.Timer] = None
+        self._offboard_requested_at = 0.0
+        self.heartbeat_timeout = 5
         self.last_heartbeat = 0
         self.mode = "MANUAL"
         self.armed = False
@@ -32,6 +72,7 @@ class PX4Drone(BaseDrone):
         # 视频流相关（PX4通常需要外部摄像头）
         self.video_stream_active = False
         self.cap = None
+        self.frame_reader: Optional[FrameReader] = None
 
         if not MAVLINK_AVAILABLE:
             print("错误: 无法使用PX4功能，请安装pymavlink: pip install pymavlink")
@@ -45,14 +86,19 @@ class PX4Drone(BaseDrone):
 
             # 等待心跳包
             print("等待PX4心跳包...")
-            self.master.wait_heartbeat(timeout=10)
+            heartbeat = self.master.wait_heartbeat(timeout=10)
+            if heartbeat is None:
+                raise TimeoutError("10秒内未收到心跳包")
 
             print(f"连接成功! 系统ID: {self.master.target_system}, 组件ID: {self.master.target_component}")
 
-            # 启动心跳监听线程
-            self.heartbeat_thread = threading.Thread(target=self._heartbeat_listener)
-            self.heartbeat_thread.daemon = True
-            self.heartbeat_thread.start()
+            # 启动接收线程，所有消息只在这里读取一次
+            self.receiver = MavlinkReceiver(self.master, on_tick=self._check_heartbeat)
+            self.receiver.add_callback('HEARTBEAT', self._on_heartbeat)
+            self.receiver.add_callback('COMMAND_ACK', self.commands.on_ack)
+            self.receiver.dispatch(heartbeat)
+            self.receiver.start()
+            self.sender.start()
 
             # 请求数据流
             self._request_data_streams()
@@ -64,31 +110,30 @@ class PX4Drone(BaseDrone):
             print(f"PX4连接失败: {e}")
             return False
 
-    def _heartbeat_listener(self):
-        """监听心跳包和系统状态"""
-        while not self.stop_heartbeat and self.master:
-            try:
-                msg = self.master.recv_match(type='HEARTBEAT', blocking=False, timeout=1)
-                if msg:
-                    self.last_heartbeat = time.time()
-                    self.mode = mavutil.mode_string_v10(msg)
-                    self.armed = bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
-                    self.system_status = msg.system_status
-
-                # 检查连接是否仍然有效
-                if time.time() - self.last_heartbeat > 5:
-                    print("警告: PX4心跳超时，可能失去连接")
-                    self.connected = False
-
-            except Exception as e:
-                print(f"心跳监听错误: {e}")
-                time.sleep(1)
+    def _on_heartbeat(self, msg):
+        """接收线程回调：更新模式和解锁状态"""
+        # 只关心飞控自己的心跳，忽略地面站等其他组件
+        if msg.get_srcSystem() != self.master.target_system or \
+                msg.type == mavutil.mavlink.MAV_TYPE_GCS:
+            return
+        self.last_heartbeat = time.time()
+        self.mode = mavutil.mode_string_v10(msg)
+        self.armed = bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+        self.system_status = msg.system_status
+        self.commands.on_mode(self.mode)
+
+    def _check_heartbeat(self):
+        """检查连接是否仍然有效"""
+        if self.connected and time.time() - self.last_heartbeat > self.heartbeat_timeout:
+            print("警告: PX4心跳超时，可能失去连接")
+            self.connected = False
 
     def _request_data_streams(self):
         """请求数据流"""
         try:
             # 请求所有数据流
-            self.master.mav.request_data_stream_send(
+            self.sender.send(
+                self.master.mav.request_data_stream_send,
                 self.master.target_system,
                 self.master.target_component,
                 mavutil.mavlink.MAV_DATA_STREAM_ALL,
@@ -117,67 +162,186 @@ class PX4Drone(BaseDrone):
     def get_frame_read(self):
         """获取视频帧读取对象"""
         if self.video_stream_active and self.cap:
-            return self.cap
+            if self.frame_reader is None:
+                self.frame_reader = FrameReader(self.cap)
+            return self.frame_reader
         return None
 
-    def takeoff(self) -> None:
-        """起飞"""
-        if not self.connected:
-            return
+    def takeoff(self) -> Optional[Future]:
+        """起飞
 
-        try:
-            # 切换到GUIDED模式
-            self._set_mode("GUIDED")
+        先切换到GUIDED模式，模式确认（或超时）后立即发送起飞命令，不阻塞调用方。
+        返回起飞命令的Future。
+        """
+        if not self.connected:
+            return None
 
-            # 等待模式切换
-            time.sleep(1)
+        takeoff_future = Future()
 
-            # 发送起飞命令
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                0,  # confirmation
-                0, 0, 0, 0,  # param1-4 (unused)
-                0, 0, 10.0   # param5-7: lat, lon, alt (10m)
-            )
-            print("PX4起飞命令已发送")
+        def send_takeoff(mode_future):
+            if mode_future.cancelled() or mode_future.exception() is not None:
+                # 与原先固定等待一样，模式未确认时仍尝试起飞
+                print(f"PX4模式切换未确认: {mode_future.exception() if not mode_future.cancelled() else '已取消'}")
+            try:
+                command_future = self.command_long(
+                    mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+                    0, 0, 0, 0,  # param1-4 (unused)
+                    0, 0, 10.0   # param5-7: lat, lon, alt (10m)
+                )
+                print("PX4起飞命令已发送")
+                _chain_future(command_future, takeoff_future)
+            except Exception as e:
+                print(f"PX4起飞失败: {e}")
+                takeoff_future.set_exception(e)
 
+        try:
+            # 切换到GUIDED模式
+            mode_future = self._set_mode("GUIDED")
+            mode_future.add_done_callback(send_takeoff)
         except Exception as e:
             print(f"PX4起飞失败: {e}")
+            takeoff_future.set_exception(e)
+
+        takeoff_future.add_done_callback(lambda future: _log_result(future, "PX4起飞"))
+        return takeoff_future
 
-    def land(self) -> None:
-        """降落"""
+    def land(self) -> Optional[Future]:
+        """降落，返回降落命令的Future"""
         if not self.connected:
-            return
+            return None
 
         try:
-            # 发送降落命令
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+            # 降落命令走优先通道：丢弃待发的RC/速度设定值，立即发送
+            self._cancel_velocity_timer()
+            future = self.command_long(
                 mavutil.mavlink.MAV_CMD_NAV_LAND,
-                0,  # confirmation
                 0, 0, 0, 0,  # param1-4 (unused)
-                0, 0, 0      # param5-7: lat, lon, alt (unused)
+                0, 0, 0,     # param5-7: lat, lon, alt (unused)
+                priority=True
             )
             print("PX4降落命令已发送")
+            future.add_done_callback(lambda done: _log_result(done, "PX4降落"))
+            return future
 
         except Exception as e:
             print(f"PX4降落失败: {e}")
 
+    def disarm(self, force: bool = False) -> None:
+        """上锁，force=True时空中强制上锁（急停）"""
+        if not self.connected:
+            return
+        self._cancel_velocity_timer()
+
+        try:
+            self.command_long(
+                mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
+                0,                        # param1: 0=上锁
+                21196 if force else 0,    # param2: 21196=强制
+                0, 0, 0, 0, 0,
+                priority=True
+            )
+            print("PX4上锁命令已发送" + ("（强制）" if force else ""))
+        except Exception as e:
+            print(f"PX4上锁失败: {e}")
+
+    def emergency_stop(self) -> None:
+        """急停：立即强制上锁，电机停转"""
+        self.disarm(force=True)
+
+    def command_long(self, command: int, *params, priority: bool = False,
+                     timeout: Optional[float] = None, retries: Optional[int] = None,
+                     mode: Optional[str] = None) -> Future:
+        """发送COMMAND_LONG，返回在COMMAND_ACK到达时完成的Future
+
+        重发时confirmation递增；priority=True时首次发送走发送线程的优先通道。
+        mode为心跳中的模式名时，心跳显示该模式也会完成Future。
+        """
+        params = (list(params) + [0] * 7)[:7]
+
+        def send_attempt(attempt):
+            send = self.sender.send_priority if priority and attempt == 0 else self.sender.send
+            send(self.master.mav.command_long_send,
+                 self.master.target_system,
+                 self.master.target_component,
+                 command,
+                 min(attempt, 255),  # confirmation
+                 *params)
+
+        return self.commands.submit(command, send_attempt, timeout, retries, mode=mode)
+
+    def set_offboard(self, enabled: bool) -> None:
+        """开关offboard速度控制"""
+        self.offboard = enabled
+        if not enabled:
+            self._cancel_velocity_timer()
+            self.sender.remove_setpoint('velocity')
+
+    def set_velocity(self, forward: float, right: float, up: float, yaw_rate: float = 0.0) -> None:
+        """更新offboard目标速度（机体坐标系，m/s，偏航角速度度/秒）
+
+        只替换发送线程推送的设定值，不等待飞控响应。首次收到非零速度且已解锁时
+        切换到OFFBOARD模式；PX4要求切换前已收到设定值，所以先同步发送一次设定值，
+        再请求切换模式，不等发送线程的下一个周期。
+        """
+        if not self.connected:
+            return
+
+        self._velocity_target = (forward, right, up, yaw_rate)
+        send = self.master.mav.set_position_target_local_ned_send
+        args = (
+            0,  # time_boot_ms
+            self.master.target_system,
+            self.master.target_component,
+            mavutil.mavlink.MAV_FRAME_BODY_NED,
+            self.VELOCITY_TYPE_MASK,
+            0, 0, 0,                              # 位置（忽略）
+            float(forward), float(right), float(-up),  # NED: z向下
+            0, 0, 0,                              # 加速度（忽略）
+            0, math.radians(yaw_rate),
+        )
+        # offboard需要持续数据流
+        self.sender.set_setpoint('velocity', send, *args, keepalive=0)
+
+        moving = any(abs(value) > 1e-3 for value in self._velocity_target)
+        if moving and self.armed and self.mode != "OFFBOARD" and \
+                time.monotonic() - self._offboard_requested_at > 1.0:
+            self._offboard_requested_at = time.monotonic()
+            self.sender.send(send, *args)
+            self._set_mode("OFFBOARD")
+
+    def _move_velocity(self, forward: float, right: float, up: float, yaw_rate: float, duration: float) -> None:
+        """offboard下按速度移动一段时间后悬停，代替按距离的command_long"""
+        self._cancel_velocity_timer()
+        self.set_velocity(forward, right, up, yaw_rate)
+        self._velocity_timer = threading.Timer(duration, self.set_velocity, (0.0, 0.0, 0.0, 0.0))
+        self._velocity_timer.daemon = True
+        self._velocity_timer.start()
+
+    def _move_distance(self, forward_cm: float, right_cm: float, up_cm: float) -> None:
+        distance = math.sqrt(forward_cm ** 2 + right_cm ** 2 + up_cm ** 2) / 100.0
+        if distance == 0:
+            return
+        duration = distance / self.max_speed
+        self._move_velocity(forward_cm / 100.0 / duration, right_cm / 100.0 / duration,
+                            up_cm / 100.0 / duration, 0.0, duration)
+
+    def _cancel_velocity_timer(self):
+        if self._velocity_timer is not None:
+            self._velocity_timer.cancel()
+            self._velocity_timer = None
+
     def move_forward(self, distance: int) -> None:
         """向前移动指定距离(cm)"""
         if not self.connected:
             return
+        if self.offboard:
+            self._move_distance(distance, 0, 0)
+            return
 
         try:
             # 在GUIDED模式下发送位置偏移命令
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+            self.command_long(
                 mavutil.mavlink.MAV_CMD_NAV_LOITER_TO_ALT,
-                0,
                 0, distance/100.0, 0, 0,  # 前进距离（米）
                 0, 0, 0
             )
@@ -192,13 +356,13 @@ class PX4Drone(BaseDrone):
         """向左移动指定距离(cm)"""
         if not self.connected:
             return
+        if self.offboard:
+            self._move_distance(0, -distance, 0)
+            return
 
         try:
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+            self.command_long(
                 mavutil.mavlink.MAV_CMD_NAV_LOITER_TO_ALT,
-                0,
                 -distance/100.0, 0, 0, 0,  # 左移距离（米）
                 0, 0, 0
             )
@@ -213,14 +377,16 @@ class PX4Drone(BaseDrone):
         """顺时针旋转指定角度"""
         if not self.connected:
             return
+        if self.offboard:
+            if degree:
+                yaw_rate = math.copysign(self.max_yaw_rate, degree)
+                self._move_velocity(0.0, 0.0, 0.0, yaw_rate, abs(degree) / self.max_yaw_rate)
+            return
 
         try:
             # 发送偏航角改变命令
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+            self.command_long(
                 mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                0,
                 degree,  # 偏航角度
                 0,       # 偏航速度
                 1,       # 相对角度（1=相对，0=绝对）
@@ -237,14 +403,14 @@ class PX4Drone(BaseDrone):
         """向上移动指定距离(cm)"""
         if not self.connected:
             return
+        if self.offboard:
+            self._move_distance(0, 0, distance)
+            return
 
         try:
             # 发送上升命令
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+            self.command_long(
                 mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                0,
                 0, 0, 0, 0,
                 0, 0, distance/100.0  # 上升高度（米）
             )
@@ -259,6 +425,12 @@ class PX4Drone(BaseDrone):
         """发送RC控制指令（范围-100到100）"""
         if not self.connected:
             return
+        if self.offboard:
+            # offboard下RC量按比例换算成目标速度
+            self._cancel_velocity_timer()
+            self.set_velocity(forw_back / 100.0 * self.max_speed, left_right / 100.0 * self.max_speed,
+                              up_down / 100.0 * self.max_speed, yaw / 100.0 * self.max_yaw_rate)
+            return
 
         try:
             # 将输入范围(-100,100)转换为MAVLink RC通道范围(1000-2000)
@@ -273,7 +445,10 @@ class PX4Drone(BaseDrone):
                 1500, 1500, 1500, 1500  # 其他通道居中
             ]
 
-            self.master.mav.rc_channels_override_send(
+            # 只更新设定值，由发送线程按固定频率发送，相同指令不会重复发送
+            self.sender.set_setpoint(
+                'rc',
+                self.master.mav.rc_channels_override_send,
                 self.master.target_system,
                 self.master.target_component,
                 *rc_channels
@@ -283,55 +458,70 @@ class PX4Drone(BaseDrone):
             print(f"PX4 RC控制失败: {e}")
 
     def get_battery(self) -> str:
-        """获取电池状态"""
-        if not self.connected:
+        """获取电池状态（接收线程缓存的最新值）"""
+        if not self.connected or self.receiver is None:
             return "N/A"
 
-        try:
-            # 尝试获取电池状态消息
-            msg = self.master.recv_match(type='BATTERY_STATUS', blocking=False)
-            if msg:
-                voltage = msg.voltages[0] / 1000.0 if msg.voltages else 0
-                return f"{voltage:.1f}V"
-            return "未知"
-        except Exception as e:
-            print(f"获取电池状态失败: {e}")
-            return "N/A"
+        msg = self.receiver.get('BATTERY_STATUS')
+        if msg and msg.voltages and msg.voltages[0] != 65535:
+            return f"{msg.voltages[0] / 1000.0:.1f}V"
+        msg = self.receiver.get('SYS_STATUS')
+        if msg and msg.voltage_battery != 65535:
+            return f"{msg.voltage_battery / 1000.0:.1f}V"
+        return "未知"
 
-    def _set_mode(self, mode: str):
-        """设置飞行模式"""
-        if not self.connected:
-            return
+    def get_message(self, msg_type: str):
+        """最近收到的某类型MAVLink消息，如'GLOBAL_POSITION_INT'，没有则返回None"""
+        return self.receiver.get(msg_type) if self.receiver else None
 
-        try:
-            # 获取模式的MAVLink常量
-            mode_mapping = {
-                "MANUAL": mavutil.mavlink.MAV_MODE_MANUAL_ARMED,
-                "GUIDED": mavutil.mavlink.MAV_MODE_GUIDED_ARMED,
-                "AUTO": mavutil.mavlink.MAV_MODE_AUTO_ARMED,
-            }
-
-            if mode in mode_mapping:
-                mode_id = mode_mapping[mode]
-                self.master.mav.set_mode_send(
-                    self.master.target_system,
-                    mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
-                    mode_id
-                )
-                print(f"设置PX4模式为: {mode}")
-            else:
-                print(f"未知模式: {mode}")
+    def get_mode(self) -> Optional[str]:
+        """获取心跳包中的飞行模式"""
+        return self.mode
 
-        except Exception as e:
-            print(f"设置模式失败: {e}")
+    def is_armed(self) -> Optional[bool]:
+        """获取心跳包中的解锁状态"""
+        return self.armed
+
+    def get_last_heartbeat(self) -> Optional[float]:
+        """最近一次心跳的时间戳"""
+        return self.last_heartbeat or None
+
+    def _set_mode(self, mode: str) -> Optional[Future]:
+        """设置飞行模式，返回在飞控确认或心跳显示该模式时完成的Future"""
+        if not self.connected:
+            return None
+
+        if mode not in self.PX4_MODES:
+            print(f"未知模式: {mode}")
+            future = Future()
+            future.set_exception(ValueError(f"未知模式: {mode}"))
+            return future
+
+        main_mode, sub_mode, heartbeat_mode = self.PX4_MODES[mode]
+        # PX4对MAV_CMD_DO_SET_MODE回复同一命令的COMMAND_ACK
+        future = self.command_long(
+            mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+            mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,  # param1: base mode
+            main_mode,                                          # param2: custom main mode
+            sub_mode,                                           # param3: custom sub mode
+            mode=heartbeat_mode
+        )
+        print(f"设置PX4模式为: {mode}")
+        future.add_done_callback(lambda done: _log_result(done, f"PX4模式切换({mode})"))
+        return future
 
     def end(self) -> None:
         """断开连接"""
         self.connected = False
-        self.stop_heartbeat = True
 
-        if self.heartbeat_thread and self.heartbeat_thread.is_alive():
-            self.heartbeat_thread.join(timeout=2)
+        self._cancel_velocity_timer()
+        self.commands.cancel_all()
+        self.sender.stop()
+        if self.receiver:
+            self.receiver.stop()
+
+        if self.frame_reader:
+            self.frame_reader.stop()
 
         if self.cap:
             self.cap.release()
@@ -342,4 +532,36 @@ class PX4Drone(BaseDrone):
             except:
                 pass
 
-        print("PX4连接已断开")
\ No newline at end of file
+        print("PX4连接已断开")
+
+
+def _chain_future(source: Future, target: Future) -> None:
+    """source完成时把结果转给target"""
+    def copy(done):
+        if target.done():
+            return
+        if done.cancelled():
+            target.cancel()
+        elif done.exception() is not None:
+            target.set_exception(done.exception())
+        else:
+            target.set_result(done.result())
+    source.add_done_callback(copy)
+
+
+def _log_result(future: Future, name: str) -> None:
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        print(f"{name}失败: {future.exception()}")
+    else:
+        print(f"{name}已确认")
+
+
+def probe(connection_string: str = "udp:127.0.0.1:14550"):
+    """注册表探测入口：返回已连接的PX4Drone，失败时关闭连接并返回None"""
+    drone = PX4Drone(connection_string)
+    if drone.connect():
+        return drone
+    drone.end()
+    return None
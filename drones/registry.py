@@ -0,0 +1,114 @@
+"""无人机后端注册表
+
+每个后端用"模块:属性"字符串声明无人机类、探测函数和两个控制器，
+只有在探测或被选中时才导入对应模块，未使用的SDK不会被加载。
+
+    register_backend('tello',
+                     drone='drones.tello_drone:TelloDrone',
+                     probe='drones.tello_drone:probe',
+                     gesture_controller='gestures.tello_gesture_controller:TelloGestureController',
+                     keyboard_controller='gestures.tello_keyboard_controller:TelloKeyboardController')
+
+探测函数probe(connection_string)返回已连接的无人机实例，连接失败返回None。
+
+第三方包可以通过entry point组"gesture_control.drone_backends"注册后端，
+entry point名称即后端名，指向一个包含上述四个键的字典。
+"""
+import sys
+import importlib
+from typing import Optional
+
+ENTRY_POINT_GROUP = "gesture_control.drone_backends"
+
+DRONE_BACKENDS = {}
+_entry_points_loaded = False
+
+
+def load_object(spec: str):
+    """按"模块:属性"导入对象"""
+    module_name, _, attr = spec.partition(":")
+    obj = importlib.import_module(module_name)
+    for name in attr.split(".") if attr else []:
+        obj = getattr(obj, name)
+    return obj
+
+
+class DroneBackend:
+    def __init__(self, name, drone, probe, gesture_controller, keyboard_controller):
+        self.name = name
+        self.drone = drone
+        self.probe_spec = probe
+        self.gesture_controller = gesture_controller
+        self.keyboard_controller = keyboard_controller
+
+    def probe(self, connection_string: str):
+        return load_object(self.probe_spec)(connection_string)
+
+    def matches(self, drone) -> bool:
+        drone_type = type(drone)
+        if "{}:{}".format(drone_type.__module__, drone_type.__qualname__) == self.drone:
+            return True
+        # 子类：只在后端模块已导入时比较，不为此加载SDK
+        if self.drone.partition(":")[0] in sys.modules:
+            return isinstance(drone, load_object(self.drone))
+        return False
+
+    def create_controllers(self, drone):
+        """返回(手势控制器, 键盘控制器)"""
+        return load_object(self.gesture_controller)(drone), load_object(self.keyboard_controller)(drone)
+
+
+def register_backend(name, drone, probe, gesture_controller, keyboard_controller):
+    DRONE_BACKENDS[name] = DroneBackend(name, drone, probe, gesture_controller, keyboard_controller)
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+
+    try:
+        found = entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            found = found.get(ENTRY_POINT_GROUP, [])
+        for entry_point in found:
+            register_backend(entry_point.name, **entry_point.load())
+    except Exception as e:
+        print(f"加载无人机后端插件失败: {e}")
+
+
+def get_backends():
+    """按注册顺序返回所有后端，包括entry point插件"""
+    _load_entry_points()
+    return list(DRONE_BACKENDS.values())
+
+
+def get_backend(name: str) -> Optional[DroneBackend]:
+    _load_entry_points()
+    return DRONE_BACKENDS.get(name)
+
+
+def backend_for(drone) -> Optional[DroneBackend]:
+    for backend in get_backends():
+        if backend.matches(drone):
+            return backend
+    return None
+
+
+register_backend("tello",
+                 drone="drones.tello_drone:TelloDrone",
+                 probe="drones.tello_drone:probe",
+                 gesture_controller="gestures.tello_gesture_controller:TelloGestureController",
+                 keyboard_controller="gestures.tello_keyboard_controller:TelloKeyboardController")
+register_backend("px4",
+                 drone="drones.px4_drone:PX4Drone",
+                 probe="drones.px4_drone:probe",
+                 gesture_controller="gestures.px4_gesture_controller:PX4GestureController",
+                 keyboard_controller="gestures.px4_keyboard_controller:PX4KeyboardController")
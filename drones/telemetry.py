@@ -0,0 +1,75 @@
+import time
+import threading
+from typing import Optional
+from .base_drone import BaseDrone
+
+
+class TelemetryCache:
+    """无人机遥测缓存
+
+    后台线程按固定间隔轮询无人机的电池、飞行模式、解锁状态和心跳时间，
+    读取接口只访问内存中的缓存值，不产生任何I/O，可以在每帧调用。
+    """
+
+    def __init__(self, drone: BaseDrone, poll_interval: float = 1.0, ttl: Optional[float] = None):
+        """
+        Args:
+            drone: 需要轮询的无人机
+            poll_interval: 轮询间隔(秒)
+            ttl: 缓存有效期(秒)，超过后is_fresh()返回False，默认为3倍轮询间隔
+        """
+        self.drone = drone
+        self.poll_interval = poll_interval
+        self.ttl = ttl if ttl is not None else poll_interval * 3
+
+        self.battery = "N/A"
+        self.mode: Optional[str] = None
+        self.armed: Optional[bool] = None
+        self.last_heartbeat: Optional[float] = None
+        self.updated_at = 0.0
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name='telemetry')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+
+    def _poll_loop(self):
+        while not self._stop_event.is_set():
+            self.poll()
+            self._stop_event.wait(self.poll_interval)
+
+    def poll(self) -> None:
+        """立即从无人机读取一次遥测数据并更新缓存"""
+        try:
+            self.battery = self.drone.get_battery()
+        except Exception as e:
+            print(f"获取电池状态失败: {e}")
+            self.battery = "N/A"
+
+        self.mode = self.drone.get_mode()
+        self.armed = self.drone.is_armed()
+        self.last_heartbeat = self.drone.get_last_heartbeat()
+        self.updated_at = time.time()
+
+    def heartbeat_age(self) -> Optional[float]:
+        """距离最近一次心跳的秒数，不支持心跳的无人机返回None"""
+        if self.last_heartbeat is None:
+            return None
+        return time.time() - self.last_heartbeat
+
+    def is_fresh(self) -> bool:
+        """缓存是否在有效期内"""
+        return time.time() - self.updated_at <= self.ttl
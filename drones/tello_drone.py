@@ -1,15 +1,24 @@
 from djitellopy import Tello
 from .base_drone import BaseDrone
+from .frame_reader import FrameReader
+from .tello_scheduler import TelloCommandScheduler
 
 class TelloDrone(BaseDrone):
-    def __init__(self):
+    def __init__(self, rc_rate: float = 20.0, rc_keepalive: float = 1.0):
         self.tello = Tello()
         self.connected = False
+        self.frame_reader = None
+        # 阻塞指令和RC速度都交给调度器，调用方不再等待Tello回复；
+        # 不变的RC值也按rc_keepalive重发，Tello超过15秒收不到指令会自动降落
+        self.scheduler = TelloCommandScheduler(rc_rate, rc_keepalive)
+        # 调度器忙时返回上次读到的电量
+        self._battery = "N/A"
     
     def connect(self) -> bool:
         try:
             self.tello.connect()
             self.connected = True
+            self.scheduler.start()
             return True
         except Exception as e:
             print(f"Tello连接失败: {e}")
@@ -20,55 +29,76 @@ class TelloDrone(BaseDrone):
             self.tello.streamon()
     
     def get_frame_read(self):
-        return self.tello.get_frame_read() if self.connected else None
+        if not self.connected:
+            return None
+        if self.frame_reader is None:
+            self.frame_reader = FrameReader(self.tello.get_frame_read())
+        return self.frame_reader
     
     def takeoff(self) -> None:
         if self.connected:
-            self.tello.takeoff()
+            self.scheduler.submit(self.tello.takeoff, sticky=True)
     
     def land(self) -> None:
         if self.connected:
-            self.tello.land()
+            self.scheduler.submit(self.tello.land, sticky=True)
     
     def move_forward(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_forward(distance)
+            self.scheduler.submit(self.tello.move_forward, distance)
     
     def move_back(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_back(distance)
+            self.scheduler.submit(self.tello.move_back, distance)
     
     def move_left(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_left(distance)
+            self.scheduler.submit(self.tello.move_left, distance)
     
     def move_right(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_right(distance)
+            self.scheduler.submit(self.tello.move_right, distance)
     
     def rotate_clockwise(self, degree: int) -> None:
         if self.connected:
-            self.tello.rotate_clockwise(degree)
+            self.scheduler.submit(self.tello.rotate_clockwise, degree)
     
     def rotate_counter_clockwise(self, degree: int) -> None:
         if self.connected:
-            self.tello.rotate_counter_clockwise(degree)
+            self.scheduler.submit(self.tello.rotate_counter_clockwise, degree)
     
     def move_up(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_up(distance)
+            self.scheduler.submit(self.tello.move_up, distance)
     
     def move_down(self, distance: int) -> None:
         if self.connected:
-            self.tello.move_down(distance)
+            self.scheduler.submit(self.tello.move_down, distance)
     
     def send_rc_control(self, left_right: int, forw_back: int, up_down: int, yaw: int) -> None:
         if self.connected:
-            self.tello.send_rc_control(left_right, forw_back, up_down, yaw)
+            self.scheduler.send_rc(self.tello.send_rc_control, left_right, forw_back, up_down, yaw)
     
     def get_battery(self) -> str:
-        return str(self.tello.get_battery()) if self.connected else "N/A"
+        if not self.connected:
+            return "N/A"
+        # battery?要等待回复，不能和正在执行的move等指令同时在途
+        done, battery = self.scheduler.try_query(self.tello.get_battery)
+        if done:
+            self._battery = str(battery)
+        return self._battery
     
     def end(self) -> None:
         if self.connected:
-            self.tello.end()
\ No newline at end of file
+            # 等待退出前排队的land执行完
+            self.scheduler.stop(timeout=10)
+        # 连接失败时也释放djitellopy的socket和接收线程
+        self.tello.end()
+
+def probe(connection_string: str = None):
+    """注册表探测入口：返回已连接的TelloDrone，失败时关闭连接并返回None"""
+    drone = TelloDrone()
+    if drone.connect():
+        return drone
+    drone.end()
+    return None
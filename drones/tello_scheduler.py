@@ -0,0 +1,152 @@
+import time
+import threading
+from typing import Callable, Optional
+
+
+class TelloCommandScheduler:
+    """Tello指令调度：阻塞指令单独一个线程，RC速度另走一条限频的通道
+
+    djitellopy的move/rotate/takeoff/land会一直等到飞机回复ok。调度器同时只执行
+    一条阻塞指令，执行期间最多保留一条待执行指令，新的请求直接替换旧的（最新的生效），
+    按住按键时不会积压一串过期的移动。takeoff/land等sticky指令不会被普通指令替换。
+    RC速度不等待回复，只保留最新值，变化时发送，频率不超过rc_rate；
+    rc_keepalive大于0时不变的值也按该间隔重发。
+    电池等查询也要等待回复，用try_query()在调用线程执行，与阻塞指令互斥，
+    调度器忙时不发送查询。
+    """
+
+    def __init__(self, rc_rate: float = 20.0, rc_keepalive: float = 0):
+        self.rc_interval = 1.0 / rc_rate
+        self.rc_keepalive = rc_keepalive
+        self._cond = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._rc = None
+        self._rc_sent = None
+        self._rc_sent_at = 0.0
+        self._running = False
+        self._threads = []
+        # 统计：被新请求替换掉的指令数、实际发出的RC数
+        self.dropped = 0
+        self.rc_sent = 0
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._command_loop, name="tello-command", daemon=True),
+            threading.Thread(target=self._rc_loop, name="tello-rc", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """等待已排队的指令执行完（如退出前的land），然后停止线程"""
+        self.wait_idle(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, func: Callable, *args, sticky: bool = False) -> bool:
+        """排入一条阻塞指令，不等待执行；被sticky指令挡住时返回False"""
+        with self._cond:
+            if self._pending is not None:
+                if self._pending[2] and not sticky:
+                    return False
+                self.dropped += 1
+            self._pending = (func, args, sticky)
+            self._cond.notify_all()
+        return True
+
+    def cancel_pending(self) -> None:
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = None
+            self._cond.notify_all()
+
+    def send_rc(self, func: Callable, *values) -> None:
+        """更新RC速度，由RC线程发送"""
+        with self._cond:
+            self._rc = (func, values)
+            self._cond.notify_all()
+
+    def try_query(self, func: Callable, *args):
+        """没有指令在执行或排队时在当前线程执行func并返回(True, 结果)，否则返回(False, None)
+
+        查询期间命令线程不会开始新指令，同一时刻只有一个请求在等待回复。
+        """
+        with self._cond:
+            if self._busy or self._pending is not None:
+                return False, None
+            self._busy = True
+        try:
+            return True, func(*args)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return self._busy or self._pending is not None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy and self._pending is None, timeout)
+
+    def _command_loop(self):
+        while True:
+            with self._cond:
+                # 等待正在执行的查询结束
+                self._cond.wait_for(lambda: not self._running or
+                                    (self._pending is not None and not self._busy))
+                if self._pending is None:
+                    return
+                func, args, _ = self._pending
+                self._pending = None
+                self._busy = True
+
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Tello指令执行失败 ({getattr(func, '__name__', func)}): {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _rc_due(self):
+        if self._rc is None:
+            return None
+        now = time.monotonic()
+        if self._rc[1] != (self._rc_sent[1] if self._rc_sent else None):
+            return max(0.0, self._rc_sent_at + self.rc_interval - now)
+        if self.rc_keepalive > 0:
+            return max(0.0, self._rc_sent_at + self.rc_keepalive - now)
+        return None
+
+    def _rc_loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    delay = self._rc_due()
+                    if delay == 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+                func, values = self._rc
+                self._rc_sent = self._rc
+                self._rc_sent_at = time.monotonic()
+
+            try:
+                func(*values)
+                self.rc_sent += 1
+            except Exception as e:
+                print(f"Tello RC发送失败: {e}")
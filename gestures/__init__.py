@@ -5,7 +5,10 @@ __all__ = [
     'TelloGestureController',
     'TelloKeyboardController',
     'PX4GestureController',
-    'PX4KeyboardController'
+    'PX4KeyboardController',
+    'ControlWorker',
+    'InferenceScheduler',
+    'MotionGate'
 ]
 
 def __getattr__(name):
@@ -27,5 +30,14 @@ def __getattr__(name):
     elif name == 'PX4KeyboardController':
         from gestures.px4_keyboard_controller import PX4KeyboardController
         return PX4KeyboardController
+    elif name == 'ControlWorker':
+        from gestures.control_worker import ControlWorker
+        return ControlWorker
+    elif name == 'InferenceScheduler':
+        from gestures.inference_scheduler import InferenceScheduler
+        return InferenceScheduler
+    elif name == 'MotionGate':
+        from gestures.motion_gate import MotionGate
+        return MotionGate
     else:
         raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Gesture classifier backends selectable by name
+
+Every backend builds a (keypoint classifier, point history classifier) pair
+with the same call interface as model.KeyPointClassifier /
+model.PointHistoryClassifier. Heavy dependencies are imported only when a
+backend is created.
+
+    tflite          model package classifiers (the notebook's .tflite files)
+    tflite_dynamic  same .tflite files (dynamic-range quantized) via TFLiteClassifier
+    tflite_float    *_float.tflite, unquantized
+    tflite_int8     *_int8.tflite, full-integer quantized input/output
+    numpy           exported .npz weights, see gestures.numpy_classifier
+
+The float and int8 variants can be produced from the notebook's .hdf5 model
+with convert_keras_model().
+"""
+import numpy as np
+
+
+KEYPOINT_MODEL = 'model/keypoint_classifier/keypoint_classifier'
+POINT_HISTORY_MODEL = 'model/point_history_classifier/point_history_classifier'
+
+CLASSIFIER_BACKENDS = {}
+
+
+def register_backend(name, factory):
+    """factory() -> (keypoint_classifier, point_history_classifier)"""
+    CLASSIFIER_BACKENDS[name] = factory
+
+
+def create_classifiers(name):
+    if name not in CLASSIFIER_BACKENDS:
+        raise ValueError("未知的分类器后端: {} (可选: {})".format(name, ', '.join(CLASSIFIER_BACKENDS)))
+    return CLASSIFIER_BACKENDS[name]()
+
+
+def _load_interpreter(model_path, num_threads=1):
+    # Prefer the standalone runtime, it does not pull in all of TensorFlow
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteClassifier(object):
+    """TFLite MLP classifier handling float and full-integer quantized models"""
+
+    def __init__(self, model_path, num_threads=1, score_th=None, invalid_value=0):
+        self.interpreter = _load_interpreter(model_path, num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+    def predict_proba(self, features):
+        input_data = np.array([features], dtype=np.float32)
+        input_dtype = self.input_details['dtype']
+        if input_dtype != np.float32:
+            scale, zero_point = self.input_details['quantization']
+            info = np.iinfo(input_dtype)
+            input_data = np.clip(np.round(input_data / scale + zero_point), info.min, info.max)
+            input_data = input_data.astype(input_dtype)
+
+        self.interpreter.set_tensor(self.input_details['index'], input_data)
+        self.interpreter.invoke()
+        result = np.squeeze(self.interpreter.get_tensor(self.output_details['index']))
+
+        if self.output_details['dtype'] != np.float32:
+            scale, zero_point = self.output_details['quantization']
+            result = (result.astype(np.float32) - zero_point) * scale
+        return result
+
+    def __call__(self, features):
+        result = self.predict_proba(features)
+        result_index = int(np.argmax(result))
+        if self.score_th is not None and result[result_index] < self.score_th:
+            result_index = self.invalid_value
+        return result_index
+
+
+def _tflite_variant(suffix):
+    def factory():
+        return (TFLiteClassifier(KEYPOINT_MODEL + suffix + '.tflite'),
+                TFLiteClassifier(POINT_HISTORY_MODEL + suffix + '.tflite', score_th=0.5))
+    return factory
+
+
+def _model_package():
+    from model import KeyPointClassifier
+    from model import PointHistoryClassifier
+    return KeyPointClassifier(), PointHistoryClassifier()
+
+
+def _numpy():
+    from gestures.numpy_classifier import NumpyKeyPointClassifier, NumpyPointHistoryClassifier
+    return NumpyKeyPointClassifier(), NumpyPointHistoryClassifier()
+
+
+register_backend('tflite', _model_package)
+register_backend('tflite_dynamic', _tflite_variant(''))
+register_backend('tflite_float', _tflite_variant('_float'))
+register_backend('tflite_int8', _tflite_variant('_int8'))
+register_backend('numpy', _numpy)
+
+
+def convert_keras_model(keras_path, tflite_path, quantization='float', representative_data=None):
+    """Converts the notebook's Keras model to TFLite
+
+    Args:
+        quantization: 'float', 'dynamic' or 'int8' (full-integer, needs representative_data)
+        representative_data: (N, features) float32 array used to calibrate int8
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(keras_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization in ('dynamic', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'int8':
+        def representative_dataset():
+            for row in representative_data[:500]:
+                yield [np.array([row], dtype=np.float32)]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+    return tflite_path
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Latency / throughput / accuracy benchmark of the keypoint classifier backends
+
+Runs every backend on the held-out split of keypoint.csv, reproducing the
+notebook's train_test_split(train_size=0.75, random_state=42), and prints
+load time, p50/p99 single-sample latency, throughput and accuracy.
+
+    python -m gestures.classifier_benchmark
+    python -m gestures.classifier_benchmark --backends numpy tflite_int8 --repeat 5
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from gestures.classifier_backends import CLASSIFIER_BACKENDS, create_classifiers
+
+
+RANDOM_SEED = 42
+TRAIN_SIZE = 0.75
+
+
+def held_out_split(features, labels, train_size=TRAIN_SIZE, random_state=RANDOM_SEED):
+    """Test part of sklearn's train_test_split with the same arguments"""
+    n_samples = len(labels)
+    n_train = math.floor(train_size * n_samples)
+    n_test = n_samples - n_train
+    permutation = np.random.RandomState(random_state).permutation(n_samples)
+    test_index = permutation[:n_test]
+    return features[test_index], labels[test_index]
+
+
+def benchmark_backend(name, features, labels, repeat=3, warmup=20):
+    start = time.perf_counter()
+    keypoint_classifier, _ = create_classifiers(name)
+    load_time = time.perf_counter() - start
+
+    for row in features[:warmup]:
+        keypoint_classifier(row)
+
+    latencies = []
+    predictions = []
+    for _ in range(repeat):
+        predictions = []
+        for row in features:
+            start = time.perf_counter()
+            predictions.append(keypoint_classifier(row))
+            latencies.append(time.perf_counter() - start)
+
+    latencies = np.array(latencies) * 1000.0
+    return {
+        'backend': name,
+        'load_ms': load_time * 1000.0,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'throughput': len(latencies) / (latencies.sum() / 1000.0),
+        'accuracy': float(np.mean(np.array(predictions) == labels)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gesture classifier backends')
+    parser.add_argument('--dataset', default='model/keypoint_classifier/keypoint.csv')
+    parser.add_argument('--backends', nargs='+', default=list(CLASSIFIER_BACKENDS),
+                        choices=list(CLASSIFIER_BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the held-out split')
+    args = parser.parse_args()
+
+    features = np.loadtxt(args.dataset, delimiter=',', dtype='float32', usecols=list(range(1, (21 * 2) + 1)))
+    labels = np.loadtxt(args.dataset, delimiter=',', dtype='int32', usecols=(0))
+    features, labels = held_out_split(features, labels)
+    print("Held-out samples: {}".format(len(labels)))
+
+    header = "{:<16}{:>10}{:>10}{:>10}{:>14}{:>10}".format(
+        'backend', 'load ms', 'p50 ms', 'p99 ms', 'samples/s', 'acc')
+    print(header)
+    print('-' * len(header))
+    for name in args.backends:
+        try:
+            result = benchmark_backend(name, features, labels, args.repeat)
+        except Exception as e:
+            print("{:<16}skipped: {}".format(name, e))
+            continue
+        print("{backend:<16}{load_ms:>10.1f}{p50_ms:>10.4f}{p99_ms:>10.4f}{throughput:>14.0f}{accuracy:>10.4f}"
+              .format(**result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import time
+import threading
+from collections import deque
+
+
+class ControlWorker(threading.Thread):
+    """常驻控制线程，按顺序把按键/手势事件交给控制器
+
+    只有一个生产者（主流水线）通过submit_*投递事件，队列中相邻的手势事件
+    只保留最新的一个，这样控制器既不会乱序执行，也不会积压过期指令。
+    按键只合并相同的键码；无按键(NO_KEY)只会被真实按键替换，不会覆盖
+    尚未处理的按键，控制器忙时按键也不会丢失。
+    手势缓冲区只由本线程访问。
+
+    tick_rate大于0时，手势模式下还按该频率调用手势控制器的tick(dt)，
+    用单调时钟计时，与推理帧率无关；事件和tick在同一线程，控制器无需加锁。
+
+    手势控制器有on_gesture时订阅手势缓冲区的变化事件，只在投票结果变化时
+    调用一次，否则每个手势事件都调用gesture_control轮询。
+    """
+
+    KEY = 'key'
+    GESTURE = 'gesture'
+    # cv.waitKey没有按键时的返回值
+    NO_KEY = 255
+
+    def __init__(self, gesture_buffer, gesture_controller, keyboard_controller=None,
+                 keyboard_control=True, maxlen=16, tick_rate=0):
+        super().__init__(name='control', daemon=True)
+        self.gesture_buffer = gesture_buffer
+        self.gesture_controller = gesture_controller
+        self.keyboard_controller = keyboard_controller
+        self.keyboard_control = keyboard_control
+        # 订阅回调在add_gesture中同步执行，仍在本线程
+        self.event_driven = hasattr(gesture_controller, 'on_gesture') and \
+            hasattr(gesture_buffer, 'subscribe')
+        if self.event_driven:
+            gesture_buffer.subscribe(self._on_gesture_change)
+
+        self.tick_interval = 1.0 / tick_rate if tick_rate > 0 else 0
+        self._last_tick = None
+        self._ticking = False
+
+        self._events = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._running = True
+
+    def submit_key(self, key):
+        self._submit(self.KEY, key)
+
+    def submit_gesture(self, gesture_id):
+        self._submit(self.GESTURE, gesture_id)
+
+    def set_keyboard_control(self, enabled):
+        # 模式切换立即生效，切换前排队的另一模式事件会被忽略
+        self.keyboard_control = enabled
+
+    def _submit(self, kind, value):
+        with self._cond:
+            if self._events and self._replaces(self._events[-1], kind, value):
+                # 最新事件覆盖尚未处理的同类事件
+                self._events[-1] = (kind, value)
+            else:
+                self._events.append((kind, value))
+            self._cond.notify()
+
+    def _replaces(self, pending, kind, value):
+        pending_kind, pending_value = pending
+        if pending_kind != kind:
+            return False
+        if kind == self.KEY:
+            return pending_value == value or pending_value == self.NO_KEY
+        return True
+
+    def run(self):
+        next_tick = time.monotonic()
+        while True:
+            event = None
+            with self._cond:
+                while self._running and not self._events:
+                    if not self.tick_interval:
+                        self._cond.wait()
+                        continue
+                    timeout = next_tick - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                if self._events:
+                    event = self._events.popleft()
+
+            try:
+                if event is not None:
+                    self._handle(*event)
+                if self.tick_interval and time.monotonic() >= next_tick:
+                    self._tick()
+                    next_tick += self.tick_interval
+                    if next_tick < time.monotonic():
+                        # 落后时不连续补tick，从现在重新计时
+                        next_tick = time.monotonic() + self.tick_interval
+            except Exception as e:
+                print(f"控制线程错误: {e}")
+
+    def _tick(self):
+        now = time.monotonic()
+        ticking = not self.keyboard_control and hasattr(self.gesture_controller, 'tick')
+        if not ticking:
+            self._ticking = False
+            return
+        if not self._ticking:
+            # 进入手势模式，从静止开始计时
+            self._ticking = True
+            self._last_tick = now
+            if hasattr(self.gesture_controller, 'reset'):
+                self.gesture_controller.reset()
+            if self.event_driven:
+                # 重新播报当前手势
+                self.gesture_buffer.reset()
+        dt = min(now - self._last_tick, 0.5)
+        self._last_tick = now
+        self.gesture_controller.tick(dt)
+
+    def _handle(self, kind, value):
+        if kind == self.KEY:
+            if not self.keyboard_control:
+                return
+            if self.keyboard_controller:
+                self.keyboard_controller.control(value)
+            else:
+                print("当前无人机类型不支持键盘控制")
+        elif kind == self.GESTURE:
+            self.gesture_buffer.add_gesture(value)
+            if not self.keyboard_control and not self.event_driven:
+                self.gesture_controller.gesture_control(self.gesture_buffer)
+
+    def _on_gesture_change(self, gesture_id, previous):
+        if not self.keyboard_control:
+            self.gesture_controller.on_gesture(gesture_id, previous)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
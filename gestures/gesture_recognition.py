@@ -1,9 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import csv
-import copy
+import time
 import argparse
-import itertools
 from collections import Counter
 from collections import deque
 
@@ -12,26 +11,72 @@ import numpy as np
 import mediapipe as mp
 
 from utils import CvFpsCalc
-from model import KeyPointClassifier
-from model import PointHistoryClassifier
+from utils.frame_pool import FramePool
+from gestures.inference_scheduler import InferenceScheduler
+from gestures.motion_gate import MotionGate
+from gestures.point_history import PointHistoryBuffer
+from gestures.landmark_features import calc_landmark_features
+from gestures.classifier_backends import create_classifiers
 
 
 class GestureRecognition:
+    # Mirrored frames preallocated for detect(), one per frame that can be in flight
+    # (inference, detection queue, control, render queue, on screen). Each one is
+    # reused only after it comes back through release_frame(); an empty pool
+    # falls back to allocating
+    FRAME_POOL_SIZE = 5
+    # Smallest ROI side as a fraction of the shorter frame side
+    ROI_MIN_SIZE = 0.25
+
     def __init__(self, use_static_image_mode=False, min_detection_confidence=0.7, min_tracking_confidence=0.7,
-                 history_length=16):
+                 history_length=16, headless=False, roi_tracking=False, roi_padding=0.5,
+                 inference_width=0, inference_height=0, target_fps=0, max_keyframe_interval=4,
+                 motion_threshold=0.5, motion_gate_threshold=0, motion_gate_max_reuse=10,
+                 classifier_backend='tflite'):
         self.use_static_image_mode = use_static_image_mode
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
         self.history_length = history_length
+        # Name registered in gestures.classifier_backends
+        self.classifier_backend = classifier_backend
+        # Headless: no debug image is created or drawn, recognize returns (None, gesture_id)
+        self.headless = headless
+        # ROI tracking: run inference on a padded crop around the last hand box
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self._roi = None
+        # Inference resolution, 0 keeps the capture resolution (height 0 keeps aspect ratio).
+        # Landmarks are normalized, so they map straight back onto the display frame
+        self.inference_width = inference_width
+        self.inference_height = inference_height
+        # Adaptive keyframe scheduling, disabled when target_fps is 0
+        self.scheduler = None
+        if target_fps > 0:
+            self.scheduler = InferenceScheduler(target_fps, max_keyframe_interval, motion_threshold)
+        # Scene-change gate in front of inference, disabled when the threshold is 0
+        self.motion_gate = None
+        if motion_gate_threshold > 0:
+            self.motion_gate = MotionGate(motion_gate_threshold, motion_gate_max_reuse)
+        # detect() returns the very same results object for a gated frame, which
+        # tells classify() to reuse the cached hand result
+        self._last_detection = None
+        self._last_classified = None
+        self._last_hand = None
 
         # Load models
         self.hands, self.keypoint_classifier, self.keypoint_classifier_labels, \
         self.point_history_classifier, self.point_history_classifier_labels = self.load_model()
 
         # Finger gesture history
-        self.point_history = deque(maxlen=history_length)
+        self.point_history = PointHistoryBuffer(history_length)
         self.finger_gesture_history = deque(maxlen=history_length)
 
+        # Preallocated preprocessing buffers, (re)created on the first frame
+        self._frame_pool = FramePool(self.FRAME_POOL_SIZE)
+        self._frame_shape = None
+        self._rgb_buffer = None
+        self._roi_buffer = None
+
     def load_model(self):
         # Model load #############################################################
         mp_hands = mp.solutions.hands
@@ -42,8 +87,7 @@ class GestureRecognition:
             min_tracking_confidence=self.min_tracking_confidence,
         )
 
-        keypoint_classifier = KeyPointClassifier()
-        point_history_classifier = PointHistoryClassifier()
+        keypoint_classifier, point_history_classifier = create_classifiers(self.classifier_backend)
 
         # Read labels ###########################################################
         with open('model/keypoint_classifier/keypoint_classifier_label.csv',
@@ -63,38 +107,218 @@ class GestureRecognition:
         return hands, keypoint_classifier, keypoint_classifier_labels, \
                point_history_classifier, point_history_classifier_labels
 
+    def warmup(self, frame_shape=(720, 960, 3)):
+        """Runs every model once on a blank frame so the first real frame is not slow
+
+        MediaPipe builds its graph and the classifiers allocate their tensors on
+        the first call; the preprocessing buffers are preallocated for
+        frame_shape as well. Scheduler, motion gate and ROI state are untouched.
+        Returns the warm-up time in seconds.
+        """
+        start = time.perf_counter()
+        frame_shape = tuple(frame_shape)
+        self._ensure_buffers(frame_shape)
+
+        rgb_image = np.zeros(self._inference_shape(frame_shape), dtype=np.uint8)
+        rgb_image.flags.writeable = False
+        self.hands.process(rgb_image)
+
+        self.keypoint_classifier(np.zeros(21 * 2, dtype=np.float32))
+        self.point_history_classifier(np.zeros(self.history_length * 2, dtype=np.float32))
+        return time.perf_counter() - start
+
     def recognize(self, image, number=-1, mode=0):
+        image, results = self.detect(image)
+        return self.classify(image, results, number, mode)
+
+    def detect(self, image):
+        # Landmark inference only, so it can run as its own pipeline stage
+        self._ensure_buffers(image.shape)
+        gated = self.motion_gate is not None and self._last_detection is not None and \
+            self.motion_gate.is_static(image)
+        keyframe = not gated and (self.scheduler is None or self.scheduler.should_run())
+
+        mirrored = None
+        if not self.headless:
+            # The mirrored BGR frame doubles as the debug image, so no extra copy is made
+            mirrored = self._frame_pool.acquire(image.shape)
+            cv.flip(image, 1, dst=mirrored)
+
+        if gated:
+            # Scene unchanged, hand the previous result on again
+            results = self._last_detection
+        elif keyframe:
+            rgb_image = self._prepare_rgb(image, mirrored)
+
+            # Detection implementation #############################################################
+            start = time.perf_counter()
+            results = self._process_hands(rgb_image)
+            if self.scheduler is not None:
+                self.scheduler.update(results, time.perf_counter() - start)
+        else:
+            # Between keyframes landmarks are extrapolated, the RGB frame is not even built
+            results = self.scheduler.predict()
+        self._last_detection = results
+
+        # In headless mode classify() only needs the frame size from the returned image
+        return (image if mirrored is None else mirrored), results
+
+    def _prepare_rgb(self, image, mirrored=None):
+        rgb_image = self._rgb_buffer
+        downsample = rgb_image.shape != image.shape
+
+        if mirrored is None:
+            # Mirror and colour-convert in place, nothing is kept for display
+            if downsample:
+                cv.resize(image, (rgb_image.shape[1], rgb_image.shape[0]), dst=rgb_image,
+                          interpolation=cv.INTER_AREA)
+                cv.flip(rgb_image, 1, dst=rgb_image)
+            else:
+                cv.flip(image, 1, dst=rgb_image)
+            cv.cvtColor(rgb_image, cv.COLOR_BGR2RGB, dst=rgb_image)
+        elif downsample:
+            cv.resize(mirrored, (rgb_image.shape[1], rgb_image.shape[0]), dst=rgb_image,
+                      interpolation=cv.INTER_AREA)
+            cv.cvtColor(rgb_image, cv.COLOR_BGR2RGB, dst=rgb_image)
+        else:
+            cv.cvtColor(mirrored, cv.COLOR_BGR2RGB, dst=rgb_image)
+
+        return rgb_image
+
+    def _process_hands(self, rgb_image):
+        if self.roi_tracking and self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            # MediaPipe wants a contiguous image, so the crop is copied into the
+            # front of a buffer sized for the whole frame instead of a fresh array
+            roi_shape = (y1 - y0, x1 - x0, rgb_image.shape[2])
+            roi_image = self._roi_buffer[:roi_shape[0] * roi_shape[1] * roi_shape[2]].reshape(roi_shape)
+            np.copyto(roi_image, rgb_image[y0:y1, x0:x1])
+            roi_image.flags.writeable = False
+            results = self.hands.process(roi_image)
+            if results.multi_hand_landmarks is not None:
+                self._map_roi_landmarks(results, rgb_image.shape)
+                self._update_roi(results, rgb_image.shape)
+                return results
+            # Tracking lost, fall back to full-frame detection
+            self._roi = None
+
+        rgb_image.flags.writeable = False
+        results = self.hands.process(rgb_image)
+        rgb_image.flags.writeable = True
+
+        if self.roi_tracking:
+            self._update_roi(results, rgb_image.shape)
+        return results
+
+    def _map_roi_landmarks(self, results, shape):
+        # Landmarks come back normalized to the crop, convert them to the full frame
+        image_width, image_height = shape[1], shape[0]
+        x0, y0, x1, y1 = self._roi
+        scale_x, scale_y = (x1 - x0) / image_width, (y1 - y0) / image_height
+        offset_x, offset_y = x0 / image_width, y0 / image_height
+
+        for hand_landmarks in results.multi_hand_landmarks:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = offset_x + landmark.x * scale_x
+                landmark.y = offset_y + landmark.y * scale_y
+
+    def _update_roi(self, results, shape):
+        if results.multi_hand_landmarks is None:
+            self._roi = None
+            return
+
+        image_width, image_height = shape[1], shape[0]
+        landmarks = results.multi_hand_landmarks[0].landmark
+        xs = [landmark.x * image_width for landmark in landmarks]
+        ys = [landmark.y * image_height for landmark in landmarks]
+        x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+
+        # Keep the crop still while the hand stays well inside it, so MediaPipe's
+        # own frame-to-frame tracking sees stable coordinates
+        if self._roi is not None:
+            rx0, ry0, rx1, ry1 = self._roi
+            margin = (rx1 - rx0) * 0.1
+            if rx0 + margin <= x_min and x_max <= rx1 - margin and \
+                    ry0 + margin <= y_min and y_max <= ry1 - margin:
+                return
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_padding)
+        side = max(side, min(image_width, image_height) * self.ROI_MIN_SIZE)
+        center_x, center_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+
+        x0 = int(max(0, center_x - side / 2))
+        y0 = int(max(0, center_y - side / 2))
+        x1 = int(min(image_width, center_x + side / 2))
+        y1 = int(min(image_height, center_y + side / 2))
+        self._roi = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
+
+    def _inference_shape(self, shape):
+        image_height, image_width = shape[0], shape[1]
+        if self.inference_width <= 0 or self.inference_width >= image_width:
+            return shape
+        width = self.inference_width
+        height = self.inference_height
+        if height <= 0:
+            height = max(1, round(image_height * width / image_width))
+        return (height, width, shape[2])
+
+    def _ensure_buffers(self, shape):
+        if self._frame_shape == shape:
+            return
+        self._frame_shape = shape
+        self._rgb_buffer = np.empty(self._inference_shape(shape), dtype=np.uint8)
+        # The ROI never exceeds the inference frame; a ROI from the old size may, so drop it
+        self._roi_buffer = np.empty(self._rgb_buffer.size, dtype=np.uint8)
+        self._roi = None
+        if not self.headless:
+            self._frame_pool.reset(shape)
+
+    def release_frame(self, image):
+        """Gives a frame returned by detect() back once it has been shown or dropped"""
+        if image is not None and not self.headless:
+            self._frame_pool.release(image)
+
+    def classify(self, image, results, number=-1, mode=0):
 
         # TODO: Move constants to other place
         USE_BRECT = True
 
-        image = cv.flip(image, 1)  # Mirror display
-        debug_image = copy.deepcopy(image)
+        # detect() already hands out a private mirrored copy to draw on
+        debug_image = None if self.headless else image
 
         # Saving gesture id for drone controlling
         gesture_id = -1
 
-        # Detection implementation #############################################################
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
-
-        image.flags.writeable = False
-        results = self.hands.process(image)
-        image.flags.writeable = True
+        # Same results object as last time: motion gate reused the detection
+        reuse = results is self._last_classified and self._last_hand is not None
+        self._last_classified = results
 
         #  ####################################################################
         if results.multi_hand_landmarks is not None:
             for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
                                                   results.multi_handedness):
-                # Bounding box calculation
-                brect = self._calc_bounding_rect(debug_image, hand_landmarks)
-                # Landmark calculation
-                landmark_list = self._calc_landmark_list(debug_image, hand_landmarks)
-
-                # Conversion to relative coordinates / normalized coordinates
-                pre_processed_landmark_list = self._pre_process_landmark(
-                    landmark_list)
-                pre_processed_point_history_list = self._pre_process_point_history(
-                    debug_image, self.point_history)
+                if reuse:
+                    brect, landmark_list, hand_sign_id, point, finger_gesture_text = self._last_hand
+                    self.point_history.append(point)
+                    if not self.headless:
+                        debug_image = self._draw_bounding_rect(USE_BRECT, debug_image, brect)
+                        debug_image = self._draw_landmarks(debug_image, landmark_list)
+                        debug_image = self._draw_info_text(
+                            debug_image, brect, handedness,
+                            self.keypoint_classifier_labels[hand_sign_id], finger_gesture_text)
+                    gesture_id = hand_sign_id
+                    continue
+
+                # Landmarks, bounding box and normalized relative coordinates in one pass
+                landmark_list, brect, pre_processed_landmark_list = self._calc_landmark_features(
+                    image, hand_landmarks)
+                # The finger gesture classifier only has something to look at once the
+                # history is full and holds at least one pointer sample
+                point_history_ready = self.point_history.is_full() and self.point_history.has_pointer()
+                pre_processed_point_history_list = None
+                if point_history_ready or mode == 2:
+                    pre_processed_point_history_list = self.point_history.normalized(
+                        image.shape[1], image.shape[0])
 
                 # Write to the dataset file
                 self._logging_csv(number, mode, pre_processed_landmark_list,
@@ -103,14 +327,14 @@ class GestureRecognition:
                 # Hand sign classification
                 hand_sign_id = self.keypoint_classifier(pre_processed_landmark_list)
                 if hand_sign_id == 2:  # Point gesture
-                    self.point_history.append(landmark_list[8])
+                    point = landmark_list[8]
                 else:
-                    self.point_history.append([0, 0])
+                    point = [0, 0]
+                self.point_history.append(point)
 
                 # Finger gesture classification
                 finger_gesture_id = 0
-                point_history_len = len(pre_processed_point_history_list)
-                if point_history_len == (self.history_length * 2):
+                if point_history_ready:
                     finger_gesture_id = self.point_history_classifier(
                         pre_processed_point_history_list)
 
@@ -118,24 +342,28 @@ class GestureRecognition:
                 self.finger_gesture_history.append(finger_gesture_id)
                 most_common_fg_id = Counter(
                     self.finger_gesture_history).most_common()
+                finger_gesture_text = self.point_history_classifier_labels[most_common_fg_id[0][0]]
+                self._last_hand = (brect, landmark_list, hand_sign_id, point, finger_gesture_text)
 
                 # Drawing part
-                debug_image = self._draw_bounding_rect(USE_BRECT, debug_image, brect)
-                debug_image = self._draw_landmarks(debug_image, landmark_list)
-                debug_image = self._draw_info_text(
-                    debug_image,
-                    brect,
-                    handedness,
-                    self.keypoint_classifier_labels[hand_sign_id],
-                    self.point_history_classifier_labels[most_common_fg_id[0][0]]
-                )
+                if not self.headless:
+                    debug_image = self._draw_bounding_rect(USE_BRECT, debug_image, brect)
+                    debug_image = self._draw_landmarks(debug_image, landmark_list)
+                    debug_image = self._draw_info_text(
+                        debug_image,
+                        brect,
+                        handedness,
+                        self.keypoint_classifier_labels[hand_sign_id],
+                        finger_gesture_text
+                    )
 
                 # Saving gesture
                 gesture_id = hand_sign_id
         else:
             self.point_history.append([0, 0])
 
-        debug_image = self.draw_point_history(debug_image, self.point_history)
+        if not self.headless:
+            debug_image = self.draw_point_history(debug_image, self.point_history)
 
         return debug_image, gesture_id
 
@@ -172,93 +400,16 @@ class GestureRecognition:
             csv_path = 'model/keypoint_classifier/keypoint.csv'
             with open(csv_path, 'a', newline="") as f:
                 writer = csv.writer(f)
-                writer.writerow([number, *landmark_list])
+                writer.writerow([number, *np.asarray(landmark_list).tolist()])
         if mode == 2 and (0 <= number <= 9):
             csv_path = 'model/point_history_classifier/point_history.csv'
             with open(csv_path, 'a', newline="") as f:
                 writer = csv.writer(f)
-                writer.writerow([number, *point_history_list])
+                writer.writerow([number, *point_history_list.tolist()])
         return
 
-    def _calc_bounding_rect(self, image, landmarks):
-        image_width, image_height = image.shape[1], image.shape[0]
-
-        landmark_array = np.empty((0, 2), int)
-
-        for _, landmark in enumerate(landmarks.landmark):
-            landmark_x = min(int(landmark.x * image_width), image_width - 1)
-            landmark_y = min(int(landmark.y * image_height), image_height - 1)
-
-            landmark_point = [np.array((landmark_x, landmark_y))]
-
-            landmark_array = np.append(landmark_array, landmark_point, axis=0)
-
-        x, y, w, h = cv.boundingRect(landmark_array)
-
-        return [x, y, x + w, y + h]
-
-    def _calc_landmark_list(self, image, landmarks):
-        image_width, image_height = image.shape[1], image.shape[0]
-
-        landmark_point = []
-
-        # Keypoint
-        for _, landmark in enumerate(landmarks.landmark):
-            landmark_x = min(int(landmark.x * image_width), image_width - 1)
-            landmark_y = min(int(landmark.y * image_height), image_height - 1)
-            # landmark_z = landmark.z
-
-            landmark_point.append([landmark_x, landmark_y])
-
-        return landmark_point
-
-    def _pre_process_landmark(self, landmark_list):
-        temp_landmark_list = copy.deepcopy(landmark_list)
-
-        # Convert to relative coordinates
-        base_x, base_y = 0, 0
-        for index, landmark_point in enumerate(temp_landmark_list):
-            if index == 0:
-                base_x, base_y = landmark_point[0], landmark_point[1]
-
-            temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
-            temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
-
-        # Convert to a one-dimensional list
-        temp_landmark_list = list(
-            itertools.chain.from_iterable(temp_landmark_list))
-
-        # Normalization
-        max_value = max(list(map(abs, temp_landmark_list)))
-
-        def normalize_(n):
-            return n / max_value
-
-        temp_landmark_list = list(map(normalize_, temp_landmark_list))
-
-        return temp_landmark_list
-
-    def _pre_process_point_history(self, image, point_history):
-        image_width, image_height = image.shape[1], image.shape[0]
-
-        temp_point_history = copy.deepcopy(point_history)
-
-        # Convert to relative coordinates
-        base_x, base_y = 0, 0
-        for index, point in enumerate(temp_point_history):
-            if index == 0:
-                base_x, base_y = point[0], point[1]
-
-            temp_point_history[index][0] = (temp_point_history[index][0] -
-                                            base_x) / image_width
-            temp_point_history[index][1] = (temp_point_history[index][1] -
-                                            base_y) / image_height
-
-        # Convert to a one-dimensional list
-        temp_point_history = list(
-            itertools.chain.from_iterable(temp_point_history))
-
-        return temp_point_history
+    def _calc_landmark_features(self, image, landmarks):
+        return calc_landmark_features(landmarks.landmark, image.shape[1], image.shape[0])
 
     def _draw_landmarks(self, image, landmark_point):
         if len(landmark_point) > 0:
@@ -477,17 +628,49 @@ class GestureRecognition:
 
 
 class GestureBuffer:
+    """Majority vote over the last buffer_len gestures
+
+    Subscribers registered with subscribe() are called as callback(gesture_id, previous)
+    from add_gesture() whenever the voted gesture changes, so they only see
+    transitions instead of polling get_gesture() every frame.
+    """
+
     def __init__(self, buffer_len=10):
         self.buffer_len = buffer_len
         self._buffer = deque(maxlen=buffer_len)
+        self._subscribers = []
+        # Last voted gesture announced to subscribers
+        self.current_gesture = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
 
     def add_gesture(self, gesture_id):
         self._buffer.append(gesture_id)
+        if not self._subscribers:
+            return
+
+        gesture = self.get_gesture()
+        if gesture is None or gesture == self.current_gesture:
+            return
+        previous = self.current_gesture
+        self.current_gesture = gesture
+        for callback in list(self._subscribers):
+            callback(gesture, previous)
 
     def get_gesture(self):
         counter = Counter(self._buffer).most_common()
-        if counter[0][1] >= (self.buffer_len - 1):
+        if counter and counter[0][1] >= (self.buffer_len - 1):
             self._buffer.clear()
             return counter[0][0]
         else:
             return
+
+    def reset(self):
+        """Forgets the votes and the current gesture, the next vote is announced again"""
+        self._buffer.clear()
+        self.current_gesture = None
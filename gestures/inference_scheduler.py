@@ -0,0 +1,99 @@
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+
+class InferenceScheduler:
+    """Decides which frames get full hand landmark inference
+
+    Full MediaPipe inference only runs on keyframes: every N-th frame, or
+    whenever the hand moved fast between the last two keyframes. N adapts to
+    the measured inference time so that the average per-frame inference cost
+    stays within the frame budget of target_fps. Frames in between get
+    landmarks extrapolated from the last two keyframes.
+    """
+
+    def __init__(self, target_fps=30.0, max_interval=4, motion_threshold=0.5,
+                 max_extrapolation=0.2, smoothing=0.2):
+        """
+        Args:
+            target_fps: frame rate to hold
+            max_interval: upper bound for N
+            motion_threshold: landmark speed (frame sizes per second) that forces a keyframe
+            max_extrapolation: seconds a keyframe may be extrapolated forward
+            smoothing: EMA factor for the inference time estimate
+        """
+        self.target_fps = target_fps
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.max_extrapolation = max_extrapolation
+        self.smoothing = smoothing
+
+        self.interval = 1
+        self.inference_time = None
+        self._frames_since_keyframe = 0
+
+        self._handedness = None
+        self._landmarks = None
+        self._velocity = None
+        self._keyframe_time = None
+
+    def should_run(self):
+        """Returns True when the next frame should be a keyframe"""
+        if self._frames_since_keyframe + 1 >= self.interval:
+            return True
+        if self._velocity is not None:
+            speed = np.abs(self._velocity[:, :2]).max()
+            if speed > self.motion_threshold:
+                return True
+        return False
+
+    def update(self, results, inference_time):
+        """Records the results of a keyframe and adapts the keyframe interval"""
+        now = time.monotonic()
+        self._frames_since_keyframe = 0
+
+        if self.inference_time is None:
+            self.inference_time = inference_time
+        else:
+            self.inference_time += self.smoothing * (inference_time - self.inference_time)
+        interval = math.ceil(self.inference_time * self.target_fps)
+        self.interval = int(min(max(interval, 1), self.max_interval))
+
+        if results.multi_hand_landmarks is None:
+            self._handedness = None
+            self._landmarks = None
+            self._velocity = None
+            self._keyframe_time = now
+            return
+
+        landmarks = np.array([[landmark.x, landmark.y, landmark.z]
+                              for landmark in results.multi_hand_landmarks[0].landmark])
+        if self._landmarks is not None and now > self._keyframe_time:
+            self._velocity = (landmarks - self._landmarks) / (now - self._keyframe_time)
+        else:
+            self._velocity = None
+
+        self._handedness = results.multi_handedness[:1]
+        self._landmarks = landmarks
+        self._keyframe_time = now
+
+    def predict(self):
+        """Returns MediaPipe-like results extrapolated from the last keyframes"""
+        self._frames_since_keyframe += 1
+
+        if self._landmarks is None:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+        landmarks = self._landmarks
+        if self._velocity is not None:
+            elapsed = min(time.monotonic() - self._keyframe_time, self.max_extrapolation)
+            landmarks = np.clip(landmarks + self._velocity * elapsed, [0, 0, -np.inf], [1, 1, np.inf])
+
+        hand_landmarks = SimpleNamespace(landmark=[
+            SimpleNamespace(x=x, y=y, z=z) for x, y, z in landmarks.tolist()
+        ])
+        return SimpleNamespace(multi_hand_landmarks=[hand_landmarks],
+                               multi_handedness=self._handedness)
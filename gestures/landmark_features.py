@@ -0,0 +1,28 @@
+import numpy as np
+
+
+def calc_landmark_features(landmarks, image_width, image_height):
+    """Pixel landmarks, bounding box and classifier input in one NumPy pass
+
+    landmarks is a sequence of points with .x/.y in [0, 1] (mediapipe's
+    NormalizedLandmarkList.landmark). Returns (landmark_list, brect, features):
+    the [x, y] pixel coordinates, [x_min, y_min, x_max, y_max] and the
+    wrist-relative coordinates flattened and scaled to [-1, 1].
+    """
+    # (21, 2) pixel coordinates, clipped like the per-landmark min(int(x * w), w - 1)
+    points = np.array([(landmark.x, landmark.y) for landmark in landmarks])
+    points *= (image_width, image_height)
+    landmark_array = np.minimum(points.astype(np.int32), (image_width - 1, image_height - 1))
+
+    # Bounding box, same convention as cv.boundingRect
+    x_min, y_min = landmark_array.min(axis=0)
+    x_max, y_max = landmark_array.max(axis=0) + 1
+    brect = [int(x_min), int(y_min), int(x_max), int(y_max)]
+
+    # Relative to the wrist, flattened and normalized by the largest magnitude
+    relative = (landmark_array - landmark_array[0]).ravel().astype(np.float64)
+    max_value = np.abs(relative).max()
+    if max_value > 0:
+        relative /= max_value
+
+    return landmark_array.tolist(), brect, relative
@@ -0,0 +1,53 @@
+import cv2 as cv
+import numpy as np
+
+
+class MotionGate:
+    """Cheap scene-change test run before hand inference
+
+    Each frame is shrunk to a small grayscale thumbnail and compared with the
+    thumbnail of the last frame that went through inference. If the mean
+    absolute difference stays below threshold, the previous result can be
+    reused, at most max_reuse times in a row.
+    """
+
+    def __init__(self, threshold=2.0, max_reuse=10, size=(64, 48)):
+        """
+        Args:
+            threshold: mean absolute pixel difference (0-255) below which the scene is unchanged
+            max_reuse: maximum number of consecutive frames that reuse a result
+            size: thumbnail size (width, height)
+        """
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.size = size
+
+        self.motion_energy = None
+        self._reuse_count = 0
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._diff = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._reference = None
+
+    def is_static(self, image):
+        """Returns True when the previous result may be reused for this frame"""
+        cv.resize(image, self.size, dst=self._small, interpolation=cv.INTER_AREA)
+        cv.cvtColor(self._small, cv.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is not None:
+            cv.absdiff(self._gray, self._reference, dst=self._diff)
+            self.motion_energy = cv.mean(self._diff)[0]
+            if self.motion_energy < self.threshold and self._reuse_count < self.max_reuse:
+                self._reuse_count += 1
+                return True
+
+        # This frame goes through inference and becomes the new reference
+        if self._reference is None:
+            self._reference = np.empty_like(self._gray)
+        np.copyto(self._reference, self._gray)
+        self._reuse_count = 0
+        return False
+
+    def reset(self):
+        self._reference = None
+        self._reuse_count = 0
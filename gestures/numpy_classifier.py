@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""NumPy inference for the keypoint / point-history MLP classifiers
+
+The TFLite models are plain Dense stacks (ReLU hidden layers, softmax output),
+so the forward pass is a handful of small matrix-vector products. Weights are
+exported once from the .tflite file into an uncompressed .npz, which is
+memory-mapped at load time; TensorFlow is only needed for the export.
+Every weight is stored as (in, units) in the dtype the kernel reads, so the
+mapped arrays are used as they are and never copied into the process.
+
+Dynamic-range quantized models (what the training notebook produces) keep
+their int8 weights and per-tensor/per-channel scales. Those layers are run the
+way TFLite's hybrid FULLY_CONNECTED kernel runs them: the input vector is
+quantized to int8, accumulated in int32 and rescaled, so the results match the
+TFLite interpreter. The input quantization is symmetric unless the layer's
+FullyConnectedOptions set asymmetric_quantize_inputs, in which case it uses a
+zero point and the weight row sums correct the accumulator; the export records
+the option per layer.
+
+Export:
+    python -m gestures.numpy_classifier model/keypoint_classifier/keypoint_classifier.tflite
+"""
+import sys
+import zipfile
+
+import numpy as np
+
+
+KEYPOINT_CLASSIFIER_NPZ = 'model/keypoint_classifier/keypoint_classifier.npz'
+POINT_HISTORY_CLASSIFIER_NPZ = 'model/point_history_classifier/point_history_classifier.npz'
+# Bumped when the stored layout changes; older exports have to be regenerated
+NPZ_FORMAT = 3
+
+
+def load_npz(path, mmap=True):
+    """Loads every array of an .npz, memory-mapping the uncompressed members"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+
+            # Skip the local file header to reach the raw .npy member
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length = int.from_bytes(header[26:28], 'little')
+            extra_length = int.from_bytes(header[28:30], 'little')
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or 0 in shape:
+                f.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = np.lib.format.read_array(f)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+
+def _quantize_symmetric(x):
+    # tensor_utils::SymmetricQuantizeFloats
+    value_range = np.float32(np.abs(x).max())
+    if value_range == 0:
+        return np.zeros(x.shape, dtype=np.int32), np.float32(1.0)
+    scale = value_range / np.float32(127.0)
+    scale_inv = np.float32(127.0) / value_range
+    scaled = x * scale_inv
+    # std::round, halves away from zero (np.round rounds halves to even)
+    quantized = np.sign(scaled) * np.floor(np.abs(scaled) + np.float32(0.5))
+    quantized = np.clip(quantized, -127, 127).astype(np.int32)
+    return quantized, scale
+
+
+def _quantize_asymmetric(x):
+    # tensor_utils::AsymmetricQuantizeFloats: the range always includes 0 and the
+    # zero point is nudged into [-128, 127]; the range math is done in double
+    rmin = min(0.0, float(x.min()))
+    rmax = max(0.0, float(x.max()))
+    if rmin == rmax:
+        return np.zeros(x.shape, dtype=np.int32), np.float32(1.0), 0
+    scale = (rmax - rmin) / 255.0
+    zero_point_from_min = -128.0 - rmin / scale
+    zero_point_from_max = 127.0 - rmax / scale
+    if 128.0 + abs(rmin / scale) < 127.0 + abs(rmax / scale):
+        zero_point = zero_point_from_min
+    else:
+        zero_point = zero_point_from_max
+    if zero_point <= -128.0:
+        offset = -128
+    elif zero_point >= 127.0:
+        offset = 127
+    else:
+        # std::round, halves away from zero
+        offset = int(np.sign(zero_point) * np.floor(abs(zero_point) + 0.5))
+
+    scale = np.float32(scale)
+    scale_inv = np.float32(1.0 / float(scale))
+    scaled = np.float32(offset) + x * scale_inv
+    quantized = np.sign(scaled) * np.floor(np.abs(scaled) + np.float32(0.5))
+    quantized = np.clip(quantized, -128, 127).astype(np.int32)
+    return quantized, scale, offset
+
+
+class NumpyMLPClassifier(object):
+    def __init__(self, npz_path, mmap=True):
+        weights = load_npz(npz_path, mmap=mmap)
+        if 'format' not in weights or int(weights['format']) != NPZ_FORMAT:
+            raise ValueError("{} 的格式已过期，请重新导出: python -m gestures.numpy_classifier".format(npz_path))
+
+        self.layers = []
+        index = 0
+        while 'w{}'.format(index) in weights:
+            # (in, units), float32 or int8, used straight from the mapping
+            weight = weights['w{}'.format(index)]
+            bias = weights['b{}'.format(index)]
+            scale = weights.get('w{}_scale'.format(index))
+            # Asymmetric input quantization needs the column sums of the weights
+            row_sums = None
+            if scale is not None and bool(weights.get('w{}_asymmetric'.format(index), False)):
+                row_sums = weight.sum(axis=0, dtype=np.int32)
+            self.layers.append((weight, scale, bias, row_sums))
+            index += 1
+
+        if not self.layers:
+            raise ValueError("{} 中没有找到权重".format(npz_path))
+
+    def predict_proba(self, features):
+        x = np.asarray(features, dtype=np.float32).ravel()
+        last = len(self.layers) - 1
+        for index, (weight, scale, bias, row_sums) in enumerate(self.layers):
+            if scale is None:
+                x = x @ weight + bias
+            else:
+                # Hybrid kernel: int8 x int8 -> int32, rescaled and added onto the bias;
+                # the int8 weights are widened by the matmul, not stored widened
+                if row_sums is None:
+                    quantized, input_scale = _quantize_symmetric(x)
+                    accumulator = quantized @ weight
+                else:
+                    quantized, input_scale, offset = _quantize_asymmetric(x)
+                    accumulator = quantized @ weight - offset * row_sums
+                x = bias + accumulator.astype(np.float32) * (input_scale * scale)
+            if index != last:
+                x = np.maximum(x, 0)
+
+        x = np.exp(x - x.max())
+        return x / x.sum()
+
+    def __call__(self, features):
+        return int(np.argmax(self.predict_proba(features)))
+
+
+class NumpyKeyPointClassifier(NumpyMLPClassifier):
+    def __init__(self, npz_path=KEYPOINT_CLASSIFIER_NPZ, mmap=True):
+        super().__init__(npz_path, mmap)
+
+
+class NumpyPointHistoryClassifier(NumpyMLPClassifier):
+    def __init__(self, npz_path=POINT_HISTORY_CLASSIFIER_NPZ, mmap=True,
+                 score_th=0.5, invalid_value=0):
+        super().__init__(npz_path, mmap)
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+    def __call__(self, point_history):
+        # Same thresholding as PointHistoryClassifier
+        probabilities = self.predict_proba(point_history)
+        result_index = int(np.argmax(probabilities))
+        if probabilities[result_index] < self.score_th:
+            result_index = self.invalid_value
+        return result_index
+
+
+def _dense_layers(interpreter):
+    """Returns [(weight_index, bias_index)] of the FULLY_CONNECTED ops in order"""
+    tensors = {detail['index']: detail for detail in interpreter.get_tensor_details()}
+
+    if hasattr(interpreter, '_get_ops_details'):
+        layers = []
+        for op in interpreter._get_ops_details():
+            if op['op_name'] == 'FULLY_CONNECTED':
+                layers.append((op['inputs'][1], op['inputs'][2]))
+        if layers:
+            return layers
+
+    # Older TensorFlow: chain constant tensors by shape, starting at the input size
+    size = interpreter.get_input_details()[0]['shape'][-1]
+    candidates = [detail for detail in tensors.values() if len(detail['shape']) == 2 and detail['shape'][0] > 1]
+    layers = []
+    while True:
+        weight = next((detail for detail in candidates if detail['shape'][1] == size), None)
+        if weight is None:
+            break
+        units = weight['shape'][0]
+        bias = next(detail for detail in tensors.values()
+                    if len(detail['shape']) == 1 and detail['shape'][0] == units
+                    and detail['index'] not in [b for _, b in layers])
+        layers.append((weight['index'], bias['index']))
+        candidates = [detail for detail in candidates if detail is not weight]
+        size = units
+    return layers
+
+
+def _asymmetric_inputs(tflite_path):
+    """Returns {weight tensor index: asymmetric_quantize_inputs} of the FULLY_CONNECTED ops
+
+    The option is not exposed by the interpreter, so it is read from the
+    flatbuffer with the schema bindings that ship with TensorFlow.
+    """
+    from tensorflow.lite.python import schema_py_generated as schema
+
+    with open(tflite_path, 'rb') as f:
+        model = schema.ModelT.InitFromObj(schema.Model.GetRootAsModel(f.read(), 0))
+
+    options = {}
+    for op in model.subgraphs[0].operators:
+        opcode = model.operatorCodes[op.opcodeIndex]
+        builtin_code = max(getattr(opcode, 'builtinCode', 0), getattr(opcode, 'deprecatedBuiltinCode', 0))
+        if builtin_code != schema.BuiltinOperator.FULLY_CONNECTED:
+            continue
+        asymmetric = bool(getattr(op.builtinOptions, 'asymmetricQuantizeInputs', False))
+        options[int(op.inputs[1])] = asymmetric
+    return options
+
+
+def export_tflite_weights(tflite_path, npz_path=None):
+    """Writes the Dense weights of a .tflite MLP into an uncompressed .npz"""
+    import tensorflow as tf
+
+    if npz_path is None:
+        npz_path = tflite_path.rsplit('.', 1)[0] + '.npz'
+
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    interpreter.allocate_tensors()
+    tensors = {detail['index']: detail for detail in interpreter.get_tensor_details()}
+
+    arrays = {'format': np.array(NPZ_FORMAT)}
+    layers = _dense_layers(interpreter)
+    asymmetric_inputs = None
+    for index, (weight_index, bias_index) in enumerate(layers):
+        weight = interpreter.get_tensor(weight_index)
+        if bias_index < 0:
+            # The converter drops an all-zero bias, the op then has no bias input
+            bias = np.zeros(weight.shape[0], dtype=np.float32)
+        else:
+            bias = interpreter.get_tensor(bias_index).astype(np.float32)
+        if weight.dtype == np.int8:
+            scales = tensors[weight_index]['quantization_parameters']['scales'].astype(np.float32)
+            arrays['w{}_scale'.format(index)] = scales if scales.size > 1 else scales.reshape(())
+            if asymmetric_inputs is None:
+                try:
+                    asymmetric_inputs = _asymmetric_inputs(tflite_path)
+                except ImportError as e:
+                    # Guessing the input quantization would silently change the results
+                    raise RuntimeError("无法读取 {} 的asymmetric_quantize_inputs: {}".format(tflite_path, e))
+            if weight_index not in asymmetric_inputs:
+                raise RuntimeError("{} 中找不到权重张量 {} 对应的FULLY_CONNECTED".format(tflite_path, weight_index))
+            arrays['w{}_asymmetric'.format(index)] = np.array(asymmetric_inputs[weight_index])
+        # TFLite keeps (units, in); store (in, units) so loading needs no transpose
+        arrays['w{}'.format(index)] = np.ascontiguousarray(weight.T)
+        arrays['b{}'.format(index)] = bias
+
+    np.savez(npz_path, **arrays)
+    print("导出 {} 层权重到 {}".format(len(layers), npz_path))
+    return npz_path
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:] or ['model/keypoint_classifier/keypoint_classifier.tflite',
+                                 'model/point_history_classifier/point_history_classifier.tflite']:
+        export_tflite_weights(path)
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class PointHistoryBuffer:
+    """Fixed-size ring buffer of fingertip points backed by a (history_length, 2) array
+
+    [0, 0] marks a frame without a pointing gesture, like the deque of lists it
+    replaces. The number of real pointer samples in the window is tracked on
+    append, so has_pointer() is O(1).
+    """
+
+    def __init__(self, history_length=16):
+        self.history_length = history_length
+        self._points = np.zeros((history_length, 2), dtype=np.int32)
+        self._next = 0
+        self._count = 0
+        self._pointer_count = 0
+
+    def append(self, point):
+        x, y = point
+        if self._count == self.history_length:
+            old_x, old_y = self._points[self._next]
+            if old_x != 0 or old_y != 0:
+                self._pointer_count -= 1
+        else:
+            self._count += 1
+
+        self._points[self._next] = (x, y)
+        if x != 0 or y != 0:
+            self._pointer_count += 1
+        self._next = (self._next + 1) % self.history_length
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self.ordered().tolist())
+
+    def is_full(self):
+        return self._count == self.history_length
+
+    def has_pointer(self):
+        return self._pointer_count > 0
+
+    def clear(self):
+        self._points[:] = 0
+        self._next = 0
+        self._count = 0
+        self._pointer_count = 0
+
+    def ordered(self):
+        """Points from oldest to newest"""
+        if self._count < self.history_length:
+            return self._points[:self._count]
+        return np.roll(self._points, -self._next, axis=0)
+
+    def normalized(self, image_width, image_height):
+        """Flattened coordinates relative to the oldest point, scaled by the image size"""
+        points = self.ordered()
+        if len(points) == 0:
+            return np.empty(0)
+        relative = (points - points[0]) / (image_width, image_height)
+        return relative.ravel()
@@ -1,7 +1,8 @@
 from drones.base_drone import BaseDrone  # 依赖抽象类
+from gestures.rc_smoothing import RCSmoother
 
 class PX4GestureController:
-    def __init__(self, drone: BaseDrone):
+    def __init__(self, drone: BaseDrone, ramp_rate=100.0, decay_time=0.15, keepalive=1.0):
         self.drone = drone
         self._is_landing = False
 
@@ -14,9 +15,17 @@ class PX4GestureController:
         # PX4特定的参数
         self.max_velocity = 30  # 最大速度限制
 
+        # 上面是目标速度，实际发送的速度由tick(dt)按时间平滑：
+        # 每秒最多变化ramp_rate，无手势时按时间常数decay_time衰减；
+        # 输出不变时只按keepalive间隔重发，保持链路不超时
+        self.smoother = RCSmoother(ramp_rate, decay_time, keepalive=keepalive)
+
     def gesture_control(self, gesture_buffer):
-        """处理手势控制逻辑"""
-        gesture_id = gesture_buffer.get_gesture()
+        """轮询方式：每帧取一次缓冲区的投票结果"""
+        self.on_gesture(gesture_buffer.get_gesture())
+
+    def on_gesture(self, gesture_id, previous=None):
+        """手势变化时由GestureBuffer调用，只更新目标速度，由tick()按固定频率发送"""
         print("PX4 GESTURE", gesture_id)
 
         if not self._is_landing:
@@ -25,6 +34,7 @@ class PX4GestureController:
             elif gesture_id == 1:  # STOP
                 self.forw_back_velocity = self.up_down_velocity = \
                     self.left_right_velocity = self.yaw_velocity = 0
+                self.smoother.stop()
             elif gesture_id == 5:  # Back
                 self.forw_back_velocity = max(-20, -self.max_velocity)
 
@@ -37,6 +47,7 @@ class PX4GestureController:
                 self._is_landing = True
                 self.forw_back_velocity = self.up_down_velocity = \
                     self.left_right_velocity = self.yaw_velocity = 0
+                self.smoother.stop()
                 self.drone.land()
 
             elif gesture_id == 6:  # LEFT
@@ -48,38 +59,37 @@ class PX4GestureController:
                 # 逐渐减速而不是立即停止
                 self._gradual_stop()
 
-            # 发送RC控制指令
-            self.drone.send_rc_control(
-                self.left_right_velocity,
-                self.forw_back_velocity,
-                self.up_down_velocity,
-                self.yaw_velocity
-            )
+            if gesture_id is not None and gesture_id != -1:
+                self.smoother.set_target(
+                    self.left_right_velocity,
+                    self.forw_back_velocity,
+                    self.up_down_velocity,
+                    self.yaw_velocity
+                )
+
+    def tick(self, dt):
+        """控制循环按固定频率调用，dt为距上次调用的秒数"""
+        if self._is_landing:
+            return
+        self.smoother.tick(dt, self.drone.send_rc_control)
 
     def _gradual_stop(self):
-        """逐渐减速到停止，提供更平滑的控制"""
-        decay_rate = 0.8  # 每次减少20%
-
-        self.forw_back_velocity *= decay_rate
-        self.up_down_velocity *= decay_rate
-        self.left_right_velocity *= decay_rate
-        self.yaw_velocity *= decay_rate
-
-        # 如果速度很小，直接设置为0
-        threshold = 1.0
-        if abs(self.forw_back_velocity) < threshold:
-            self.forw_back_velocity = 0
-        if abs(self.up_down_velocity) < threshold:
-            self.up_down_velocity = 0
-        if abs(self.left_right_velocity) < threshold:
-            self.left_right_velocity = 0
-        if abs(self.yaw_velocity) < threshold:
-            self.yaw_velocity = 0
+        """逐渐减速到停止，衰减按时间计算，与帧率无关"""
+        self.forw_back_velocity = self.up_down_velocity = \
+            self.left_right_velocity = self.yaw_velocity = 0
+        self.smoother.release()
+
+    def reset(self):
+        """切换回手势模式时从静止开始"""
+        self.forw_back_velocity = self.up_down_velocity = \
+            self.left_right_velocity = self.yaw_velocity = 0
+        self.smoother.reset()
 
     def emergency_stop(self):
         """紧急停止"""
         self.forw_back_velocity = self.up_down_velocity = \
             self.left_right_velocity = self.yaw_velocity = 0
+        self.smoother.stop()
         self.drone.send_rc_control(0, 0, 0, 0)
         print("PX4紧急停止")
 
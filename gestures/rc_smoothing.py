@@ -0,0 +1,68 @@
+import math
+
+
+class RCSmoother:
+    """按时间而不是按调用次数平滑RC速度
+
+    step(dt)让当前速度以不超过ramp_rate(每秒变化量)的速度逼近目标；
+    release()后目标为0，当前速度按时间常数decay_time指数衰减，
+    小于threshold时直接归零。同样的参数在快慢不同的机器上制动曲线一致。
+    tick(dt, send)在step之后发送结果，输出不变时只按keepalive间隔重发。
+    """
+
+    def __init__(self, ramp_rate=200.0, decay_time=0.15, threshold=1.0, keepalive=1.0):
+        self.ramp_rate = ramp_rate
+        self.decay_time = decay_time
+        self.threshold = threshold
+        self.keepalive = keepalive
+        # (left_right, forw_back, up_down, yaw)
+        self.target = [0.0, 0.0, 0.0, 0.0]
+        self.current = [0.0, 0.0, 0.0, 0.0]
+        self.decaying = False
+        self._last_sent = None
+        self._since_sent = 0.0
+
+    def set_target(self, left_right, forw_back, up_down, yaw):
+        self.target = [float(left_right), float(forw_back), float(up_down), float(yaw)]
+        self.decaying = False
+
+    def release(self):
+        """没有手势时逐渐减速到停止"""
+        self.target = [0.0, 0.0, 0.0, 0.0]
+        self.decaying = True
+
+    def stop(self):
+        """立即停止"""
+        self.target = [0.0, 0.0, 0.0, 0.0]
+        self.current = [0.0, 0.0, 0.0, 0.0]
+        self.decaying = False
+
+    def step(self, dt):
+        """前进dt秒，返回取整后的(left_right, forw_back, up_down, yaw)"""
+        if self.decaying:
+            factor = math.exp(-dt / self.decay_time) if self.decay_time > 0 else 0.0
+            self.current = [value * factor for value in self.current]
+        else:
+            max_step = self.ramp_rate * dt if self.ramp_rate > 0 else float('inf')
+            self.current = [value + max(-max_step, min(max_step, target - value))
+                            for value, target in zip(self.current, self.target)]
+
+        self.current = [0.0 if abs(value) < self.threshold and target == 0 else value
+                        for value, target in zip(self.current, self.target)]
+        return tuple(int(round(value)) for value in self.current)
+
+    def tick(self, dt, send):
+        """前进dt秒并用send(left_right, forw_back, up_down, yaw)发送，返回是否发送"""
+        values = self.step(dt)
+        self._since_sent += dt
+        if values == self._last_sent and self._since_sent < self.keepalive:
+            return False
+        self._last_sent = values
+        self._since_sent = 0.0
+        send(*values)
+        return True
+
+    def reset(self):
+        """立即停止，下一次tick无论输出是否变化都发送"""
+        self.stop()
+        self._last_sent = None
@@ -1,8 +1,9 @@
 #from djitellopy import Tello
 from drones.base_drone import BaseDrone  # 改为依赖抽象类
+from gestures.rc_smoothing import RCSmoother
 
 class TelloGestureController:
-    def __init__(self, drone: BaseDrone):
+    def __init__(self, drone: BaseDrone, ramp_rate=300.0, keepalive=1.0):
         self.drone = drone
         self._is_landing = False
 
@@ -12,8 +13,16 @@ class TelloGestureController:
         self.left_right_velocity = 0
         self.yaw_velocity = 0
 
+        # 目标速度由tick(dt)按固定频率发送，每秒最多变化ramp_rate；
+        # 输出不变时只按keepalive间隔重发，保持链路不超时
+        self.smoother = RCSmoother(ramp_rate, keepalive=keepalive)
+
     def gesture_control(self, gesture_buffer):
-        gesture_id = gesture_buffer.get_gesture()
+        """轮询方式：每帧取一次缓冲区的投票结果"""
+        self.on_gesture(gesture_buffer.get_gesture())
+
+    def on_gesture(self, gesture_id, previous=None):
+        """手势变化时由GestureBuffer调用，只更新目标速度，由tick()按固定频率发送"""
         print("GESTURE", gesture_id)
 
         if not self._is_landing:
@@ -22,6 +31,7 @@ class TelloGestureController:
             elif gesture_id == 1:  # STOP
                 self.forw_back_velocity = self.up_down_velocity = \
                     self.left_right_velocity = self.yaw_velocity = 0
+                self.smoother.stop()
             if gesture_id == 5:  # Back
                 self.forw_back_velocity = -30
 
@@ -34,7 +44,8 @@ class TelloGestureController:
                 self._is_landing = True
                 self.forw_back_velocity = self.up_down_velocity = \
                     self.left_right_velocity = self.yaw_velocity = 0
-                self.tello.land()
+                self.smoother.stop()
+                self.drone.land()
 
             elif gesture_id == 6: # LEFT
                 self.left_right_velocity = 20
@@ -45,5 +56,18 @@ class TelloGestureController:
                 self.forw_back_velocity = self.up_down_velocity = \
                     self.left_right_velocity = self.yaw_velocity = 0
 
-            self.drone.send_rc_control(self.left_right_velocity, self.forw_back_velocity,
-                                       self.up_down_velocity, self.yaw_velocity)
+            if gesture_id is not None:
+                self.smoother.set_target(self.left_right_velocity, self.forw_back_velocity,
+                                         self.up_down_velocity, self.yaw_velocity)
+
+    def tick(self, dt):
+        """控制循环按固定频率调用，dt为距上次调用的秒数"""
+        if self._is_landing:
+            return
+        self.smoother.tick(dt, self.drone.send_rc_control)
+
+    def reset(self):
+        """切换回手势模式时从静止开始"""
+        self.forw_back_velocity = self.up_down_velocity = \
+            self.left_right_velocity = self.yaw_velocity = 0
+        self.smoother.reset()
@@ -1,21 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import configargparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import cv2 as cv
-
-from utils import CvFpsCalc
+# 只在模块级导入轻量模块；cv2、mediapipe、TensorFlow、无人机SDK在main()中按需加载，
+# 启动耗时由tests/startup_time_test.py检查
+from utils.pipeline import LatestQueue, PipelineStage
 from drones.drone_detector import DroneDetector
-
-from drones.tello_drone import TelloDrone
-from drones.px4_drone import PX4Drone
-
-from gestures import *
-from gestures.tello_gesture_controller import TelloGestureController
-from gestures.px4_gesture_controller import PX4GestureController
-from gestures.px4_keyboard_controller import PX4KeyboardController
-
-import threading
+from drones.registry import backend_for
+from drones.telemetry import TelemetryCache
+from gestures.control_worker import ControlWorker
 
 
 def get_args():
@@ -28,6 +23,37 @@ def get_args():
     parser.add("--height", help='cap height', type=int)
     parser.add("--is_keyboard", help='To use Keyboard control by default', type=bool)
     parser.add('--use_static_image_mode', action='store_true', help='True if running on photos')
+    parser.add('--headless', action='store_true',
+               help='No window and no HUD drawing, keys are read from the terminal')
+    parser.add('--roi_tracking', action='store_true',
+               help='Run hand inference on a crop around the previous hand box')
+    parser.add("--roi_padding",
+               help='Padding around the hand box for ROI tracking, relative to box size',
+               type=float, default=0.5)
+    parser.add("--inference_width",
+               help='Hand inference width, 0 to use the capture resolution',
+               type=int, default=0)
+    parser.add("--inference_height",
+               help='Hand inference height, 0 to keep the capture aspect ratio',
+               type=int, default=0)
+    parser.add("--target_fps",
+               help='Run full hand inference only on keyframes to hold this frame rate, 0 to disable',
+               type=float, default=0)
+    parser.add("--max_keyframe_interval",
+               help='Maximum number of frames between two keyframes',
+               type=int, default=4)
+    parser.add("--motion_threshold",
+               help='Landmark speed (frame sizes per second) that forces a keyframe',
+               type=float, default=0.5)
+    parser.add("--motion_gate_threshold",
+               help='Reuse the previous result while the mean frame difference (0-255) stays below this, 0 to disable',
+               type=float, default=0)
+    parser.add("--motion_gate_max_reuse",
+               help='Maximum number of consecutive frames that reuse a result',
+               type=int, default=10)
+    parser.add("--classifier_backend",
+               help='Gesture classifier backend: tflite, tflite_dynamic, tflite_float, tflite_int8 or numpy',
+               type=str, default='tflite')
     parser.add("--min_detection_confidence",
                help='min_detection_confidence',
                type=float)
@@ -40,8 +66,26 @@ def get_args():
     parser.add("--px4_connection_string",
                help='PX4 MAVLink connection string (e.g., udp:127.0.0.1:14550)',
                type=str)
+    parser.add("--drone_backend",
+               help='Only probe this registered drone backend (e.g. tello, px4), empty to probe all of them',
+               type=str)
+    parser.add("--max_frame_age",
+               help='Drop frames older than this many seconds before inference, 0 to disable',
+               type=float, default=0.5)
+    parser.add("--telemetry_interval",
+               help='Battery/state polling interval in seconds',
+               type=float, default=1.0)
+    parser.add("--control_rate",
+               help='Gesture control loop frequency in Hz, independent of the inference frame rate, must be > 0',
+               type=float, default=20.0)
+    parser.add("--px4_offboard",
+               help='PX4: stream offboard velocity setpoints instead of RC override',
+               action='store_true')
 
     args = parser.parse_args()
+    # 手势控制器只在控制循环的tick中发送，关闭后手势模式不会发出任何指令
+    if args.control_rate <= 0:
+        parser.error('--control_rate must be greater than 0')
 
     return args
 
@@ -59,11 +103,29 @@ def select_mode(key, mode):
     return number, mode
 
 
+def load_gesture_detector(args):
+    from gestures.gesture_recognition import GestureRecognition
+
+    start = time.perf_counter()
+    gesture_detector = GestureRecognition(args.use_static_image_mode, args.min_detection_confidence,
+                                          args.min_tracking_confidence, headless=args.headless,
+                                          roi_tracking=args.roi_tracking, roi_padding=args.roi_padding,
+                                          inference_width=args.inference_width,
+                                          inference_height=args.inference_height,
+                                          target_fps=args.target_fps,
+                                          max_keyframe_interval=args.max_keyframe_interval,
+                                          motion_threshold=args.motion_threshold,
+                                          motion_gate_threshold=args.motion_gate_threshold,
+                                          motion_gate_max_reuse=args.motion_gate_max_reuse,
+                                          classifier_backend=args.classifier_backend)
+    warmup_time = gesture_detector.warmup()
+    print("手势模型加载完成: {:.2f}s (预热 {:.2f}s)".format(time.perf_counter() - start, warmup_time))
+    return gesture_detector
+
+
 def main():
     # init global vars
     global gesture_buffer
-    global gesture_id
-    global battery_status
 
     # Argument parsing
     args = get_args()
@@ -71,67 +133,128 @@ def main():
     WRITE_CONTROL = False
     in_flight = False
 
+    # 手势模型在后台线程加载并预热，与无人机连接同时进行
+    model_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-warmup')
+    detector_future = model_loader.submit(load_gesture_detector, args)
+
     # Camera preparation
     # 使用configargparse自动处理的PX4连接字符串参数（来自命令行或config.txt）
-    drone = DroneDetector.detect_and_connect(args.px4_connection_string)
+    drone = DroneDetector.detect_and_connect(args.px4_connection_string, backend=args.drone_backend or None)
     if not drone:
         print("无人机连接失败，退出程序")
+        model_loader.shutdown(wait=False)
         exit(1)
     drone.streamon()
 
     cap = drone.get_frame_read()
-
-    # 根据无人机类型初始化相应的控制器
-    drone_type = type(drone).__name__
-    print(f"检测到无人机类型: {drone_type}")
-
-    if drone_type == "TelloDrone":
-        gesture_controller = TelloGestureController(drone)
-        keyboard_controller = TelloKeyboardController(drone)
-    elif drone_type == "PX4Drone":
-        gesture_controller = PX4GestureController(drone)
-        keyboard_controller = PX4KeyboardController(drone)
-        print("PX4无人机支持手势和键盘控制模式")
-    else:
-        print(f"不支持的无人机类型: {drone_type}")
+    if cap is None:
+        print("无法获取视频流，退出程序")
+        model_loader.shutdown(wait=False)
+        drone.end()
         exit(1)
 
-    gesture_detector = GestureRecognition(args.use_static_image_mode, args.min_detection_confidence,
-                                          args.min_tracking_confidence)
+    # Heavy modules, only loaded once configuration and connection are done
+    import cv2 as cv
+    from utils.cvfpscalc import CvFpsCalc
+    from gestures.gesture_recognition import GestureBuffer
+
+    # 根据无人机类型初始化相应的控制器，控制器模块由注册表按需导入
+    backend = backend_for(drone)
+    if backend is None:
+        print(f"不支持的无人机类型: {type(drone).__name__}")
+        model_loader.shutdown(wait=False)
+        drone.end()
+        exit(1)
+    print(f"检测到无人机类型: {backend.name}")
+    gesture_controller, keyboard_controller = backend.create_controllers(drone)
+    if args.px4_offboard and hasattr(drone, 'set_offboard'):
+        drone.set_offboard(True)
+        print("PX4 offboard速度控制已启用")
+
+    gesture_detector = detector_future.result()
+    model_loader.shutdown()
     gesture_buffer = GestureBuffer(buffer_len=args.buffer_len)
 
-    def drone_control(key, keyboard_controller, gesture_controller, drone_type):
-        global gesture_buffer
-
-        if KEYBOARD_CONTROL:
-            if keyboard_controller:
-                keyboard_controller.control(key)
-            else:
-                print("当前无人机类型不支持键盘控制")
-        else:
-            gesture_controller.gesture_control(gesture_buffer)
-
-    def drone_battery(drone):
-        global battery_status
-        try:
-            battery_status = drone.get_battery()[:-2]
-        except:
-            battery_status = -1
+    # 常驻控制线程：按键和手势事件按顺序投递，不再每帧新建线程；
+    # 手势控制器按control_rate固定频率发送，不受推理速度影响
+    control_worker = ControlWorker(gesture_buffer, gesture_controller, keyboard_controller,
+                                   keyboard_control=KEYBOARD_CONTROL, tick_rate=args.control_rate)
+
+    # 遥测缓存：后台轮询电池/状态，渲染时只读内存
+    telemetry = TelemetryCache(drone, poll_interval=args.telemetry_interval)
+
+    # Pipeline stages ####################################################
+    # capture -> landmark inference -> classification & control -> render
+    # 每个阶段之间只保留最新一帧，处理不过来的旧帧直接丢弃
+    # 丢弃的检测结果和画面把镜像帧还给gesture_detector的缓冲池
+    frame_queue = LatestQueue(maxsize=1)
+    detection_queue = LatestQueue(maxsize=1, on_drop=lambda item: gesture_detector.release_frame(item[2]))
+    render_queue = LatestQueue(maxsize=1, on_drop=gesture_detector.release_frame)
+
+    last_seq = 0
+
+    def is_stale(timestamp):
+        return args.max_frame_age > 0 and time.monotonic() - timestamp > args.max_frame_age
+
+    def capture_stage():
+        # 只转发没见过的新帧，同一帧不会重复推理、投票和发送指令
+        nonlocal last_seq
+        frame_item = cap.wait_for_new(last_seq, timeout=0.1)
+        if frame_item is None:
+            return None
+        last_seq = frame_item[0]
+        return frame_item
+
+    def inference_stage(frame_item):
+        seq, timestamp, frame = frame_item
+        if is_stale(timestamp):
+            return None
+        image, results = gesture_detector.detect(frame)
+        return seq, timestamp, image, results
+
+    def control_stage(detection):
+        seq, timestamp, image, results = detection
+        debug_image, gesture_id = gesture_detector.classify(image, results, number, mode)
+        control_worker.submit_gesture(gesture_id)
+        return debug_image
+
+    stages = [
+        PipelineStage('capture', capture_stage, output_queue=frame_queue),
+        PipelineStage('inference', inference_stage, input_queue=frame_queue, output_queue=detection_queue),
+        PipelineStage('control', control_stage, input_queue=detection_queue, output_queue=render_queue),
+    ]
 
     # FPS Measurement
     cv_fps_calc = CvFpsCalc(buffer_len=10)
 
     mode = 0
     number = -1
-    battery_status = -1
 
     drone.move_down(20)
 
+    # 无界面模式下按键来自终端
+    key_reader = None
+    if args.headless:
+        from utils.console_input import ConsoleKeyReader
+        key_reader = ConsoleKeyReader()
+        key_reader.start()
+        print("无界面模式: 在终端输入按键控制 (ESC退出)")
+
+    control_worker.start()
+    telemetry.start()
+    for stage in stages:
+        stage.start()
+
+    # Render stage: imshow/waitKey must stay on the main thread
     while True:
-        fps = cv_fps_calc.get()
+        if key_reader:
+            debug_image = None
+            key = key_reader.read_key(timeout=0.05)
+        else:
+            debug_image = render_queue.get(timeout=0.01)
+            key = cv.waitKey(1) & 0xff
 
         # Process Key (ESC: end)
-        key = cv.waitKey(1) & 0xff
         if key == 27:  # ESC
             break
         elif key == 32:  # Space
@@ -156,32 +279,45 @@ def main():
             mode = 1
             WRITE_CONTROL = True
             KEYBOARD_CONTROL = True
+        control_worker.set_keyboard_control(KEYBOARD_CONTROL)
 
         if WRITE_CONTROL:
             number = -1
             if 48 <= key <= 57:  # 0 ~ 9
                 number = key - 48
 
-        # Camera capture
-        image = cap.frame
-
-        debug_image, gesture_id = gesture_detector.recognize(image, number, mode)
-        gesture_buffer.add_gesture(gesture_id)
+        # Keys are not dropped while waiting for a frame
+        if KEYBOARD_CONTROL and (key_reader or debug_image is not None or key != 255):
+            control_worker.submit_key(key)
 
-        # Start control thread
-        threading.Thread(target=drone_control, args=(key, keyboard_controller, gesture_controller, drone_type,)).start()
-        threading.Thread(target=drone_battery, args=(drone,)).start()
+        if debug_image is None:
+            continue
+        fps = cv_fps_calc.get()
 
         debug_image = gesture_detector.draw_info(debug_image, fps, mode, number)
 
         # Battery status and image rendering
+        battery_status = telemetry.battery[:-2] if telemetry.is_fresh() else -1
         cv.putText(debug_image, "Battery: {}".format(battery_status), (5, 720 - 5),
                    cv.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
         cv.imshow('Tello Gesture Recognition', debug_image)
+        # imshow已复制画面，缓冲区可以给下一帧使用
+        gesture_detector.release_frame(debug_image)
+
+    for stage in stages:
+        stage.stop()
+    control_worker.stop()
+    for stage in stages:
+        stage.join(timeout=1)
+    control_worker.join(timeout=1)
+    telemetry.stop()
 
     drone.land()
     drone.end()
-    cv.destroyAllWindows()
+    if key_reader:
+        key_reader.stop()
+    else:
+        cv.destroyAllWindows()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+终端按键读取测试脚本（cbreak部分需要pty，Windows上跳过）
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.console_input import ConsoleKeyReader, skip_escape_sequence
+
+
+def _reader(data):
+    data = list(data)
+    return lambda: data.pop(0) if data else None
+
+
+def test_skip_escape_sequence():
+    # 单独的ESC
+    assert not skip_escape_sequence(_reader(b''))
+    # 方向键、F5、F1、Alt+x都整段读掉
+    for tail in (b'[A', b'[15~', b'OP', b'x'):
+        read_byte = _reader(tail + b'q')
+        assert skip_escape_sequence(read_byte)
+        assert read_byte() == ord('q'), tail
+    print("[OK] 转义序列整段丢弃")
+
+
+def _read_all(reader, timeout=0.3):
+    keys = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        key = reader.read_key(timeout=0.02)
+        if key != ConsoleKeyReader.NO_KEY:
+            keys.append(key)
+    return keys
+
+
+def test_cbreak_arrow_keys_do_not_quit():
+    try:
+        import pty
+        import termios
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    master, slave = pty.openpty()
+    stream = os.fdopen(slave, 'r')
+    try:
+        original = termios.tcgetattr(slave)
+        reader = ConsoleKeyReader(stream)
+        reader.start()
+        assert termios.tcgetattr(slave) != original
+
+        os.write(master, b'w\x1b[A\x1b[Bs')
+        assert _read_all(reader) == [ord('w'), ord('s')]
+        # 后面没有其他字节的ESC才是退出键
+        os.write(master, b'\x1b')
+        assert _read_all(reader) == [27]
+
+        reader.stop()
+        assert termios.tcgetattr(slave) == original
+    finally:
+        os.close(master)
+        stream.close()
+    print("[OK] 方向键不会被当作ESC，stop()恢复终端设置")
+
+
+def test_line_mode_strips_escape_sequences():
+    read_fd, write_fd = os.pipe()
+    stream = os.fdopen(read_fd, 'r')
+    try:
+        reader = ConsoleKeyReader(stream)
+        reader.start()
+        os.write(write_fd, b'w\x1b[Aa\n\x1b\n')
+        assert _read_all(reader) == [ord('w'), ord('a'), 27]
+    finally:
+        os.close(write_fd)
+    print("[OK] 按行读取时去掉转义序列")
+
+
+if __name__ == "__main__":
+    print("开始终端按键测试...")
+    print("=" * 50)
+
+    test_skip_escape_sequence()
+    test_cbreak_arrow_keys_do_not_quit()
+    test_line_mode_strips_escape_sequences()
+
+    print("=" * 50)
+    print("终端按键测试完成")
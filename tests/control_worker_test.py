@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+常驻控制线程测试脚本
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestures.control_worker import ControlWorker
+from gestures.rc_smoothing import RCSmoother
+
+
+class MockBuffer:
+    def __init__(self):
+        self.gestures = []
+
+    def add_gesture(self, gesture_id):
+        self.gestures.append(gesture_id)
+
+
+class MockController:
+    def __init__(self):
+        self.keys = []
+        self.gesture_calls = 0
+
+    def control(self, key):
+        self.keys.append(key)
+
+    def gesture_control(self, gesture_buffer):
+        self.gesture_calls += 1
+
+
+def _wait_idle(worker, timeout=1.0):
+    deadline = time.time() + timeout
+    while worker._events and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def test_ordered_key_delivery():
+    """不同按键按投递顺序送达，相邻的相同按键和手势事件只保留最新一个"""
+    buffer = MockBuffer()
+    controller = MockController()
+    worker = ControlWorker(buffer, controller, controller, keyboard_control=True)
+
+    # 线程启动前投递，验证合并逻辑
+    worker.submit_key(ord('w'))
+    worker.submit_key(ord('a'))
+    worker.submit_key(ord('a'))
+    worker.submit_gesture(1)
+    worker.submit_key(ord('s'))
+    worker.start()
+    _wait_idle(worker)
+    worker.stop()
+    worker.join(timeout=1)
+
+    assert controller.keys == [ord('w'), ord('a'), ord('s')], controller.keys
+    assert buffer.gestures == [1], buffer.gestures
+    assert controller.gesture_calls == 0
+    print("[OK] 按键事件有序且最新优先")
+
+
+def test_no_key_does_not_replace_pending_key():
+    """控制器阻塞时，下一帧的NO_KEY不会覆盖尚未处理的按键"""
+    import threading
+
+    buffer = MockBuffer()
+    controller = MockController()
+    release = threading.Event()
+    blocked = threading.Event()
+
+    def control(key):
+        controller.keys.append(key)
+        if key == ord('t'):
+            # 模拟阻塞的起飞指令
+            blocked.set()
+            release.wait(1)
+
+    controller.control = control
+    worker = ControlWorker(buffer, controller, controller, keyboard_control=True)
+    worker.start()
+    worker.submit_key(ord('t'))
+    assert blocked.wait(1)
+    worker.submit_key(ord('w'))
+    for _ in range(5):
+        worker.submit_key(ControlWorker.NO_KEY)
+    release.set()
+    _wait_idle(worker)
+    worker.stop()
+    worker.join(timeout=1)
+
+    assert controller.keys == [ord('t'), ord('w'), ControlWorker.NO_KEY], controller.keys
+    print("[OK] 控制器忙时按键不会丢失")
+
+
+def test_gesture_mode():
+    """手势模式下忽略按键，手势写入缓冲区并驱动控制器"""
+    buffer = MockBuffer()
+    controller = MockController()
+    worker = ControlWorker(buffer, controller, controller, keyboard_control=False)
+    worker.start()
+
+    worker.submit_key(ord('w'))
+    _wait_idle(worker)
+    worker.submit_gesture(3)
+    _wait_idle(worker)
+    worker.stop()
+    worker.join(timeout=1)
+
+    assert controller.keys == []
+    assert buffer.gestures == [3]
+    assert controller.gesture_calls == 1
+    print("[OK] 手势模式事件处理正常")
+
+
+class TickController(MockController):
+    def __init__(self):
+        super().__init__()
+        self.ticks = []
+
+    def tick(self, dt):
+        self.ticks.append((time.monotonic(), dt))
+
+
+def test_fixed_rate_ticks():
+    """手势模式下按固定频率tick，与事件到达速度无关"""
+    buffer = MockBuffer()
+    controller = TickController()
+    worker = ControlWorker(buffer, controller, controller, keyboard_control=False, tick_rate=50)
+    worker.start()
+    # 推理很慢：0.5秒内只来两帧
+    worker.submit_gesture(0)
+    time.sleep(0.25)
+    worker.submit_gesture(0)
+    time.sleep(0.25)
+    worker.set_keyboard_control(True)
+    time.sleep(0.1)
+    ticks_in_keyboard_mode = len(controller.ticks)
+    time.sleep(0.1)
+    worker.stop()
+    worker.join(timeout=1)
+
+    assert 20 <= ticks_in_keyboard_mode <= 30, ticks_in_keyboard_mode
+    # 键盘模式不tick
+    assert len(controller.ticks) == ticks_in_keyboard_mode
+    dts = [dt for _, dt in controller.ticks[1:]]
+    assert all(0.005 <= dt <= 0.06 for dt in dts), dts
+    print(f"[OK] 0.5秒内tick {ticks_in_keyboard_mode} 次")
+
+
+def test_decay_is_frame_rate_independent():
+    """同样的时间内，不同tick频率的制动结果一致"""
+    results = []
+    for rate in (10, 30, 120):
+        smoother = RCSmoother(ramp_rate=1000, decay_time=0.15)
+        smoother.set_target(0, 20, 0, 0)
+        smoother.step(1.0)
+        smoother.release()
+        for _ in range(int(rate * 0.2)):
+            smoother.step(1.0 / rate)
+        results.append(smoother.current[1])
+    assert max(results) - min(results) < 1e-6, results
+
+    smoother = RCSmoother(ramp_rate=100)
+    smoother.set_target(0, 30, 0, 0)
+    # 斜坡限制：0.1秒最多变化10
+    assert smoother.step(0.1) == (0, 10, 0, 0)
+    assert smoother.step(1.0) == (0, 30, 0, 0)
+    print("[OK] 衰减和斜坡按时间计算")
+
+
+class MockDrone:
+    def __init__(self):
+        self.rc = []
+
+    def send_rc_control(self, *values):
+        self.rc.append(values)
+
+    def land(self):
+        pass
+
+
+def test_transitions_and_keepalive():
+    """控制器只在手势变化时更新，输出不变时只按keepalive重发"""
+    from gestures.px4_gesture_controller import PX4GestureController
+    from gestures.tello_gesture_controller import TelloGestureController
+
+    for controller_class, forward in ((PX4GestureController, 20), (TelloGestureController, 30)):
+        drone = MockDrone()
+        controller = controller_class(drone, ramp_rate=1000, keepalive=0.42)
+        controller.on_gesture(0)
+        for _ in range(20):  # 1秒，50ms一次
+            controller.tick(0.05)
+        # 第一次达到目标速度，之后约每0.45秒(9个tick)重发一次
+        assert drone.rc == [(0, forward, 0, 0)] * 3, drone.rc
+
+        # 重新进入手势模式后下一次tick立即发送
+        controller.reset()
+        controller.tick(0.05)
+        assert drone.rc[-1] == (0, 0, 0, 0) and len(drone.rc) == 4, drone.rc
+    print("[OK] 输出不变时按keepalive重发")
+
+
+def test_gesture_buffer_events():
+    """手势缓冲区只在投票结果变化时通知订阅者"""
+    try:
+        from gestures.gesture_recognition import GestureBuffer
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    buffer = GestureBuffer(buffer_len=3)
+    events = []
+    buffer.subscribe(lambda gesture_id, previous: events.append((gesture_id, previous)))
+    for gesture_id in [0, 0, 0, 0, 0, 0, 1, 1, 1, 0]:
+        buffer.add_gesture(gesture_id)
+    assert events == [(0, None), (1, 0)], events
+
+    controller = MockController()
+    controller.on_gesture = lambda gesture_id, previous: controller.keys.append(gesture_id)
+    worker = ControlWorker(buffer, controller, controller, keyboard_control=False)
+    worker.start()
+    for _ in range(6):
+        worker.submit_gesture(2)
+        time.sleep(0.01)
+    _wait_idle(worker)
+    worker.stop()
+    worker.join(timeout=1)
+    # 每帧的手势不会逐个触发控制器
+    assert controller.keys == [2], controller.keys
+    assert controller.gesture_calls == 0
+    print("[OK] 手势变化事件只触发一次")
+
+
+if __name__ == "__main__":
+    print("开始控制线程测试...")
+    print("=" * 50)
+
+    test_ordered_key_delivery()
+    test_no_key_does_not_replace_pending_key()
+    test_gesture_mode()
+    test_fixed_rate_ticks()
+    test_decay_is_frame_rate_independent()
+    test_transitions_and_keepalive()
+    test_gesture_buffer_events()
+
+    print("=" * 50)
+    print("控制线程测试完成")
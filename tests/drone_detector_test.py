@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+并行无人机探测测试脚本
+"""
+
+import sys
+import os
+import time
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.drone_detector import DroneDetector, load_cached_backend
+from drones.registry import DRONE_BACKENDS, register_backend, backend_for
+
+
+class MockDrone:
+    def __init__(self, name, delay, ok=True):
+        self.name = name
+        self.delay = delay
+        self.ok = ok
+        self.ended = False
+
+    def connect(self):
+        time.sleep(self.delay)
+        return self.ok
+
+    def end(self):
+        self.ended = True
+
+
+class MockController:
+    def __init__(self, drone):
+        self.drone = drone
+
+
+def mock_probe(connection_string):
+    return MockDrone('registered', 0.0)
+
+
+def _probe(drone):
+    def probe(connection_string):
+        if drone.connect():
+            return drone
+        drone.end()
+        return None
+    return probe
+
+
+def _probes(drones):
+    return [(name, _probe(drone)) for name, drone in drones.items()]
+
+
+def test_first_responder_wins():
+    drones = {'slow': MockDrone('slow', 0.5), 'fast': MockDrone('fast', 0.05)}
+    start = time.monotonic()
+    drone = DroneDetector.detect_and_connect(probes=_probes(drones), cache_path=None)
+    elapsed = time.monotonic() - start
+
+    assert drone is drones['fast']
+    assert elapsed < 0.4, elapsed
+    # 晚到的连接被断开
+    time.sleep(0.6)
+    assert drones['slow'].ended
+    assert not drones['fast'].ended
+    print(f"[OK] 最快的后端胜出 ({elapsed:.2f}s)，晚到的连接被断开")
+
+
+def test_failed_probe_falls_through():
+    drones = {'broken': MockDrone('broken', 0.01, ok=False), 'ok': MockDrone('ok', 0.1)}
+    drone = DroneDetector.detect_and_connect(probes=_probes(drones), cache_path=None)
+    assert drone is drones['ok']
+    assert drones['broken'].ended
+
+    drones = {'broken': MockDrone('broken', 0.01, ok=False)}
+    assert DroneDetector.detect_and_connect(probes=_probes(drones), cache_path=None) is None
+    print("[OK] 失败的探测不影响其他后端")
+
+
+def test_cached_backend_gets_head_start():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, 'last_drone.json')
+        drones = {'a': MockDrone('a', 0.05), 'b': MockDrone('b', 0.2)}
+        assert DroneDetector.detect_and_connect('udp:127.0.0.1:14551', probes=_probes(drones),
+                                                cache_path=cache_path) is drones['a']
+        assert load_cached_backend(cache_path) == {'backend': 'a', 'connection_string': 'udp:127.0.0.1:14551'}
+
+        # 缓存的后端先开始，其余后端等待head_start，即使它们握手更快
+        with open(cache_path, 'w') as f:
+            json.dump({'backend': 'b', 'connection_string': 'udp:127.0.0.1:14551'}, f)
+        drones = {'a': MockDrone('a', 0.01), 'b': MockDrone('b', 0.2)}
+        drone = DroneDetector.detect_and_connect(probes=_probes(drones), cache_path=cache_path, head_start=1.0)
+        assert drone is drones['b']
+    print("[OK] 上次连接的后端优先")
+
+
+def test_registry_backend():
+    module = MockDrone.__module__
+    register_backend('mock', drone=f'{module}:MockDrone', probe=f'{module}:mock_probe',
+                     gesture_controller=f'{module}:MockController',
+                     keyboard_controller=f'{module}:MockController')
+    try:
+        probes = [('mock', DRONE_BACKENDS['mock'].probe)]
+        drone = DroneDetector.detect_and_connect(probes=probes, cache_path=None)
+        backend = backend_for(drone)
+        assert backend.name == 'mock'
+        gesture_controller, keyboard_controller = backend.create_controllers(drone)
+        assert gesture_controller.drone is drone and keyboard_controller.drone is drone
+    finally:
+        DRONE_BACKENDS.pop('mock', None)
+    print("[OK] 注册表按需加载后端和控制器")
+
+
+def test_selected_backend_only():
+    """指定后端时只探测它，其他后端的模块不被导入"""
+    module = MockDrone.__module__
+    register_backend('mock', drone=f'{module}:MockDrone', probe=f'{module}:mock_probe',
+                     gesture_controller=f'{module}:MockController',
+                     keyboard_controller=f'{module}:MockController')
+    register_backend('broken', drone='missing_sdk_module:Drone', probe='missing_sdk_module:probe',
+                     gesture_controller=f'{module}:MockController',
+                     keyboard_controller=f'{module}:MockController')
+    try:
+        drone = DroneDetector.detect_and_connect(cache_path=None, backend='mock')
+        assert drone.name == 'registered'
+        assert 'missing_sdk_module' not in sys.modules
+        assert DroneDetector.detect_and_connect(cache_path=None, backend='no_such_backend') is None
+    finally:
+        DRONE_BACKENDS.pop('mock', None)
+        DRONE_BACKENDS.pop('broken', None)
+    print("[OK] 指定后端时只探测该后端")
+
+
+if __name__ == "__main__":
+    print("开始无人机探测测试...")
+    print("=" * 50)
+
+    test_first_responder_wins()
+    test_failed_probe_falls_through()
+    test_cached_backend_gets_head_start()
+    test_registry_backend()
+    test_selected_backend_only()
+
+    print("=" * 50)
+    print("无人机探测测试完成")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+生成NumPy分类器一致性测试用的小模型（需要TensorFlow）
+
+42 -> 64 -> 32 -> 4 的Dense网络，动态范围量化后前两层为int8（超过1024个元素），
+最后一层保持float。分别生成对称和非对称(asymmetric_quantize_inputs)输入量化的
+两个.tflite，并保存导出的权重和TFLite内置kernel在固定输入上的输出，
+没有TensorFlow时也能检查NumPy实现。
+
+    python tests/fixtures/make_classifier_fixtures.py
+"""
+
+import sys
+import os
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(FIXTURE_DIR)))
+
+import flatbuffers
+import numpy as np
+import tensorflow as tf
+from tensorflow.lite.python import schema_py_generated as schema
+
+from gestures.numpy_classifier import export_tflite_weights
+
+SAMPLE_COUNT = 64
+
+
+def _convert():
+    tf.random.set_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input((42,)),
+        tf.keras.layers.Dense(64, activation='relu', bias_initializer='random_normal'),
+        tf.keras.layers.Dense(32, activation='relu', bias_initializer='random_normal'),
+        tf.keras.layers.Dense(4, activation='softmax', bias_initializer='random_normal'),
+    ])
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def _with_asymmetric_inputs(tflite_model, asymmetric):
+    model = schema.ModelT.InitFromObj(schema.Model.GetRootAsModel(tflite_model, 0))
+    for op in model.subgraphs[0].operators:
+        opcode = model.operatorCodes[op.opcodeIndex]
+        if max(opcode.builtinCode, opcode.deprecatedBuiltinCode) == schema.BuiltinOperator.FULLY_CONNECTED:
+            op.builtinOptions.asymmetricQuantizeInputs = asymmetric
+    builder = flatbuffers.Builder(1024)
+    builder.Finish(model.Pack(builder), file_identifier=b'TFL3')
+    return bytes(builder.Output())
+
+
+def main():
+    tflite_model = _convert()
+    features = np.random.default_rng(0).uniform(-1, 1, size=(SAMPLE_COUNT, 42)).astype(np.float32)
+
+    for name, asymmetric in (('mlp_symmetric', False), ('mlp_asymmetric', True)):
+        tflite_path = os.path.join(FIXTURE_DIR, name + '.tflite')
+        with open(tflite_path, 'wb') as f:
+            f.write(_with_asymmetric_inputs(tflite_model, asymmetric))
+        export_tflite_weights(tflite_path, os.path.join(FIXTURE_DIR, name + '.npz'))
+
+        # XNNPACK会重新量化混合int8层的输入，与内置kernel结果不同，这里只用内置kernel
+        interpreter = tf.lite.Interpreter(
+            model_path=tflite_path,
+            experimental_op_resolver_type=tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES)
+        interpreter.allocate_tensors()
+        input_index = interpreter.get_input_details()[0]['index']
+        output_index = interpreter.get_output_details()[0]['index']
+        outputs = []
+        for row in features:
+            interpreter.set_tensor(input_index, row[np.newaxis])
+            interpreter.invoke()
+            outputs.append(np.squeeze(interpreter.get_tensor(output_index)))
+        np.savez(os.path.join(FIXTURE_DIR, name + '_expected.npz'),
+                 features=features, probabilities=np.array(outputs, dtype=np.float32))
+        print("生成 {}".format(tflite_path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+帧缓冲池测试脚本（只需要NumPy）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frame_pool import FramePool
+from utils.pipeline import LatestQueue
+
+
+def test_frames_in_use_are_not_reused():
+    pool = FramePool(size=2)
+    pool.reset((4, 4, 3))
+    first = pool.acquire((4, 4, 3))
+    second = pool.acquire((4, 4, 3))
+    # 池已空：新分配，不会交出仍在使用的帧
+    third = pool.acquire((4, 4, 3))
+    assert third is not first and third is not second
+    assert pool.allocated == 1
+
+    pool.release(first)
+    assert pool.acquire((4, 4, 3)) is first
+    print("[OK] 只交出已归还的缓冲区")
+
+
+def test_release_is_checked():
+    pool = FramePool(size=2)
+    pool.reset((4, 4, 3))
+    frame = pool.acquire((4, 4, 3))
+    pool.release(frame)
+    # 重复归还不会让同一缓冲区出现两次
+    pool.release(frame)
+    assert pool.free_count() == 2
+    # 池已满、尺寸不符、None都直接丢弃
+    pool.release(frame.copy())
+    pool.release(FramePool(1).acquire((2, 2, 3)))
+    pool.release(None)
+    assert pool.free_count() == 2
+
+    # 尺寸变化后旧尺寸的帧不再回收
+    old = pool.acquire((4, 4, 3))
+    pool.reset((8, 8, 3))
+    pool.release(old)
+    assert pool.free_count() == 2
+    assert pool.acquire((8, 8, 3)).shape == (8, 8, 3)
+    print("[OK] 重复归还和尺寸不符的帧被拒绝")
+
+
+def test_dropped_queue_items_return_to_pool():
+    pool = FramePool(size=3)
+    pool.reset((2, 2, 3))
+    queue = LatestQueue(maxsize=1, on_drop=pool.release)
+    frames = [pool.acquire((2, 2, 3)) for _ in range(3)]
+    for frame in frames:
+        queue.put(frame)
+    # 前两帧被新帧挤掉，归还到池中
+    assert pool.free_count() == 2
+    assert queue.get(timeout=0) is frames[2]
+    queue.put(frames[2])
+    queue.clear()
+    assert pool.free_count() == 3
+    print("[OK] 队列丢弃的帧归还缓冲池")
+
+
+if __name__ == "__main__":
+    print("开始帧缓冲池测试...")
+    print("=" * 50)
+
+    test_frames_in_use_are_not_reused()
+    test_release_is_checked()
+    test_dropped_queue_items_return_to_pool()
+
+    print("=" * 50)
+    print("帧缓冲池测试完成")
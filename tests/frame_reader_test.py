@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+视频帧序号测试脚本
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.frame_reader import FrameReader
+
+
+class MockBackgroundFrameRead:
+    """模拟djitellopy的BackgroundFrameRead"""
+    def __init__(self):
+        self.frame = None
+
+
+class MockVideoCapture:
+    """模拟cv.VideoCapture，每次read()返回一个新帧"""
+    def __init__(self):
+        self.count = 0
+
+    def read(self):
+        time.sleep(0.01)
+        self.count += 1
+        return True, [self.count]
+
+
+def test_frame_attribute_source():
+    """同一帧对象不会产生新的序号"""
+    source = MockBackgroundFrameRead()
+    reader = FrameReader(source)
+    assert reader.wait_for_new(0, timeout=0.01) is None
+
+    source.frame = [1]
+    seq, timestamp, frame = reader.wait_for_new(0, timeout=0.1)
+    assert seq == 1 and frame == [1]
+    assert reader.wait_for_new(seq, timeout=0.01) is None
+
+    source.frame = [2]
+    seq, timestamp2, frame = reader.wait_for_new(seq, timeout=0.1)
+    assert seq == 2 and frame == [2] and timestamp2 >= timestamp
+    print("[OK] BackgroundFrameRead帧序号正常")
+
+
+def test_video_capture_source():
+    """VideoCapture由后台线程读取，序号单调递增"""
+    reader = FrameReader(MockVideoCapture())
+    first = reader.wait_for_new(0, timeout=1)
+    second = reader.wait_for_new(first[0], timeout=1)
+    reader.stop()
+    assert first is not None and second is not None
+    assert second[0] > first[0]
+    assert second[1] >= first[1]
+    print("[OK] VideoCapture帧序号正常")
+
+
+if __name__ == "__main__":
+    print("开始视频帧序号测试...")
+    print("=" * 50)
+
+    test_frame_attribute_source()
+    test_video_capture_source()
+
+    print("=" * 50)
+    print("视频帧序号测试完成")
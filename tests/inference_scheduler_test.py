@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+关键帧调度测试脚本（只需要NumPy）
+"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestures.inference_scheduler import InferenceScheduler
+
+
+def _results(x, y=0.5):
+    """类似MediaPipe结果的21个关键点，全部位于(x, y)"""
+    hand = SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0)] * 21)
+    return SimpleNamespace(multi_hand_landmarks=[hand], multi_handedness=['Right'])
+
+
+NO_HAND = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+
+def test_interval_follows_inference_time():
+    scheduler = InferenceScheduler(target_fps=30, max_interval=4, smoothing=0.5)
+    assert scheduler.should_run()
+
+    # 推理50ms，30fps下每帧33ms：每2帧推理一次
+    scheduler.update(NO_HAND, 0.05)
+    assert scheduler.interval == 2
+    scheduler.predict()
+    assert scheduler.should_run()
+
+    # 推理变慢，平滑后的估计上升，间隔不超过max_interval
+    for _ in range(10):
+        scheduler.update(NO_HAND, 0.5)
+    assert scheduler.interval == 4
+    # 推理变快后回到每帧推理
+    for _ in range(20):
+        scheduler.update(NO_HAND, 0.001)
+    assert scheduler.interval == 1
+    print("[OK] 关键帧间隔随推理耗时调整")
+
+
+def test_fast_motion_forces_keyframe():
+    scheduler = InferenceScheduler(target_fps=30, max_interval=4, motion_threshold=0.5)
+    scheduler.update(_results(0.5), 0.5)
+    time.sleep(0.05)
+    # 慢速移动：不提前推理
+    scheduler.update(_results(0.501), 0.5)
+    assert scheduler.interval == 4
+    assert not scheduler.should_run()
+
+    time.sleep(0.05)
+    # 0.05秒移动0.2个画面宽度，速度约4 > 0.5
+    scheduler.update(_results(0.701), 0.5)
+    assert scheduler.should_run()
+    print("[OK] 快速移动时强制关键帧")
+
+
+def test_predict_extrapolates_and_clips():
+    scheduler = InferenceScheduler(target_fps=30, max_interval=4, max_extrapolation=0.2)
+    assert scheduler.predict().multi_hand_landmarks is None
+
+    scheduler.update(_results(0.5), 0.5)
+    time.sleep(0.05)
+    scheduler.update(_results(0.9), 0.5)
+    time.sleep(0.05)
+    # 速度约8/秒，外推后超出画面，x被裁剪到1
+    predicted = scheduler.predict()
+    assert predicted.multi_handedness == ['Right']
+    landmark = predicted.multi_hand_landmarks[0].landmark[0]
+    assert landmark.x == 1.0
+    assert landmark.y == 0.5
+
+    # 没有手时预测也没有手
+    scheduler.update(NO_HAND, 0.5)
+    assert scheduler.predict().multi_hand_landmarks is None
+    print("[OK] 外推结果裁剪到画面内")
+
+
+if __name__ == "__main__":
+    print("开始关键帧调度测试...")
+    print("=" * 50)
+
+    test_interval_follows_inference_time()
+    test_fast_motion_forces_keyframe()
+    test_predict_extrapolates_and_clips()
+
+    print("=" * 50)
+    print("关键帧调度测试完成")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+手部关键点特征一致性测试脚本（只需要NumPy）
+
+与原先逐个关键点计算的_calc_bounding_rect/_calc_landmark_list/_pre_process_landmark
+逐项比较，包括int截断、cv.boundingRect的+1和归一化。
+"""
+
+import sys
+import os
+import copy
+import itertools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from gestures.landmark_features import calc_landmark_features
+
+
+class Landmark:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def _bounding_rect(points):
+    """cv.boundingRect对整数点集的结果：宽高包含两端像素"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1
+
+
+def _reference(landmarks, image_width, image_height):
+    """原先的逐关键点实现"""
+    landmark_point = []
+    for landmark in landmarks:
+        landmark_x = min(int(landmark.x * image_width), image_width - 1)
+        landmark_y = min(int(landmark.y * image_height), image_height - 1)
+        landmark_point.append([landmark_x, landmark_y])
+
+    x, y, w, h = _bounding_rect(landmark_point)
+    brect = [x, y, x + w, y + h]
+
+    temp_landmark_list = copy.deepcopy(landmark_point)
+    base_x, base_y = temp_landmark_list[0]
+    for point in temp_landmark_list:
+        point[0] -= base_x
+        point[1] -= base_y
+    temp_landmark_list = list(itertools.chain.from_iterable(temp_landmark_list))
+    max_value = max(map(abs, temp_landmark_list))
+    return landmark_point, brect, [n / max_value for n in temp_landmark_list]
+
+
+def test_matches_reference():
+    rng = np.random.default_rng(0)
+    for image_width, image_height in ((960, 720), (640, 480), (321, 199)):
+        for _ in range(200):
+            # 包括画面外的负坐标和大于1的坐标
+            coords = rng.uniform(-0.3, 1.3, size=(21, 2))
+            landmarks = [Landmark(x, y) for x, y in coords]
+            landmark_list, brect, features = calc_landmark_features(landmarks, image_width, image_height)
+            expected_list, expected_brect, expected_features = _reference(landmarks, image_width, image_height)
+
+            assert landmark_list == expected_list
+            assert brect == expected_brect
+            assert all(type(value) is int for value in brect)
+            assert features.tolist() == expected_features
+    print("[OK] 与逐关键点实现结果一致")
+
+
+def test_truncation_and_clipping():
+    landmarks = [Landmark(0.5, 0.5), Landmark(-0.0015, 1.0), Landmark(1.2, -0.25), Landmark(0.9999, 0.001)]
+    landmark_list, brect, _ = calc_landmark_features(landmarks, 1000, 100)
+    # int()向零截断，-1.5 -> -1；超出右/下边界的裁剪到w-1/h-1，负坐标不裁剪
+    assert landmark_list == [[500, 50], [-1, 99], [999, -25], [999, 0]]
+    assert brect == [-1, -25, 1000, 100]
+    assert landmark_list == _reference(landmarks, 1000, 100)[0]
+    print("[OK] 截断和边界裁剪一致")
+
+
+def test_all_zero():
+    """所有关键点重合时原实现除以0，向量化版本返回全0"""
+    landmarks = [Landmark(0.0, 0.0)] * 21
+    landmark_list, brect, features = calc_landmark_features(landmarks, 960, 720)
+    assert landmark_list == [[0, 0]] * 21
+    assert brect == [0, 0, 1, 1]
+    assert features.shape == (42,) and not features.any()
+    try:
+        _reference(landmarks, 960, 720)
+        assert False, "原实现应当除以0"
+    except ZeroDivisionError:
+        pass
+    print("[OK] 全0关键点不会除以0")
+
+
+if __name__ == "__main__":
+    print("开始关键点特征测试...")
+    print("=" * 50)
+
+    test_matches_reference()
+    test_truncation_and_clipping()
+    test_all_zero()
+
+    print("=" * 50)
+    print("关键点特征测试完成")
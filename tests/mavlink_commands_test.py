@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+COMMAND_ACK命令Future测试脚本（不需要pymavlink和飞控）
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.mavlink_commands import (CommandTracker, CommandRejected, MAV_CMD_DO_SET_MODE,
+                                     MAVLINK_MSG_ID_SET_MODE,
+                                     MAV_RESULT_ACCEPTED, MAV_RESULT_IN_PROGRESS,
+                                     MAV_RESULT_TEMPORARILY_REJECTED)
+
+MAV_CMD_NAV_TAKEOFF = 22
+MAV_RESULT_DENIED = 2
+
+
+class Ack:
+    def __init__(self, command, result):
+        self.command = command
+        self.result = result
+
+
+def test_ack_completes_future():
+    tracker = CommandTracker(timeout=1.0, retries=2)
+    attempts = []
+    future = tracker.submit(MAV_CMD_NAV_TAKEOFF, attempts.append)
+    assert not future.done()
+    tracker.on_ack(Ack(MAV_CMD_NAV_TAKEOFF, MAV_RESULT_ACCEPTED))
+    assert future.result(timeout=0) == MAV_RESULT_ACCEPTED
+    assert attempts == [0]
+    print("[OK] COMMAND_ACK完成Future")
+
+
+def test_timeout_and_retries():
+    tracker = CommandTracker(timeout=0.05, retries=2)
+    attempts = []
+    future = tracker.submit(MAV_CMD_NAV_TAKEOFF, attempts.append)
+    try:
+        future.result(timeout=1.0)
+        assert False, "应当超时"
+    except TimeoutError:
+        pass
+    # 首次发送加两次重发，confirmation递增
+    assert attempts == [0, 1, 2]
+    print("[OK] 无回复时重发后超时")
+
+
+def test_rejected_and_in_progress():
+    tracker = CommandTracker(timeout=0.1, retries=1)
+    attempts = []
+    future = tracker.submit(MAV_CMD_NAV_TAKEOFF, attempts.append)
+    tracker.on_ack(Ack(MAV_CMD_NAV_TAKEOFF, MAV_RESULT_TEMPORARILY_REJECTED))
+    assert attempts == [0, 1]
+    tracker.on_ack(Ack(MAV_CMD_NAV_TAKEOFF, MAV_RESULT_IN_PROGRESS))
+    time.sleep(0.05)
+    tracker.on_ack(Ack(MAV_CMD_NAV_TAKEOFF, MAV_RESULT_DENIED))
+    try:
+        future.result(timeout=0)
+        assert False, "应当被拒绝"
+    except CommandRejected as e:
+        assert e.result == MAV_RESULT_DENIED
+    print("[OK] 暂时拒绝会重试，拒绝结束Future")
+
+
+def test_mode_future_and_pipelining():
+    tracker = CommandTracker(timeout=1.0, retries=0)
+    sent = []
+    mode_future = tracker.submit(MAV_CMD_DO_SET_MODE, lambda attempt: sent.append('mode'), mode='OFFBOARD')
+    # 后续命令在模式确认后立即发出，无需固定等待
+    mode_future.add_done_callback(
+        lambda done: tracker.submit(MAV_CMD_NAV_TAKEOFF, lambda attempt: sent.append('takeoff')))
+    tracker.on_mode('POSCTL')
+    assert sent == ['mode']
+    tracker.on_mode('OFFBOARD')
+    assert mode_future.result(timeout=0) == MAV_RESULT_ACCEPTED
+    assert sent == ['mode', 'takeoff']
+
+    # 同一命令重复提交，旧的被取消
+    first = tracker.submit(MAV_CMD_NAV_TAKEOFF, lambda attempt: None)
+    second = tracker.submit(MAV_CMD_NAV_TAKEOFF, lambda attempt: None)
+    assert first.cancelled() and not second.done()
+    tracker.cancel_all()
+    assert second.cancelled()
+    print("[OK] 模式切换由心跳确认，命令可以流水线发送")
+
+
+def test_px4_mode_ack():
+    """PX4对模式切换回复command=MAV_CMD_DO_SET_MODE的COMMAND_ACK"""
+    tracker = CommandTracker(timeout=1.0, retries=2)
+    attempts = []
+    start = time.monotonic()
+    future = tracker.submit(MAV_CMD_DO_SET_MODE, attempts.append, mode='LOITER')
+    tracker.on_ack(Ack(MAV_CMD_DO_SET_MODE, MAV_RESULT_ACCEPTED))
+    assert future.result(timeout=0) == MAV_RESULT_ACCEPTED
+    # 一次发送即完成，不等待超时重发
+    assert attempts == [0]
+    assert time.monotonic() - start < 0.5
+
+    # 回复SET_MODE消息ID的飞控按同一个命令处理
+    future = tracker.submit(MAV_CMD_DO_SET_MODE, attempts.append, mode='OFFBOARD')
+    tracker.on_ack(Ack(MAVLINK_MSG_ID_SET_MODE, MAV_RESULT_DENIED))
+    try:
+        future.result(timeout=0)
+        assert False, "应当被拒绝"
+    except CommandRejected as e:
+        assert e.command == MAV_CMD_DO_SET_MODE
+    print("[OK] PX4的DO_SET_MODE回复完成模式切换Future")
+
+
+if __name__ == "__main__":
+    print("开始命令Future测试...")
+    print("=" * 50)
+
+    test_ack_completes_future()
+    test_timeout_and_retries()
+    test_rejected_and_in_progress()
+    test_mode_future_and_pipelining()
+    test_px4_mode_ack()
+
+    print("=" * 50)
+    print("命令Future测试完成")
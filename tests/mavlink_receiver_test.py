@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MAVLink接收线程测试脚本（不需要pymavlink和飞控）
+"""
+
+import sys
+import os
+import time
+import queue
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.mavlink_receiver import MavlinkReceiver
+
+
+class MockMessage:
+    def __init__(self, msg_type, **fields):
+        self._type = msg_type
+        self.__dict__.update(fields)
+
+    def get_type(self):
+        return self._type
+
+
+class MockMaster:
+    """recv_match只在收到消息或超时时返回，记录被调用的方式"""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.calls = 0
+        self.blocking = []
+
+    def recv_match(self, type=None, blocking=False, timeout=None):
+        self.calls += 1
+        self.blocking.append((type, blocking))
+        try:
+            return self.messages.get(timeout=timeout if blocking else 0)
+        except queue.Empty:
+            return None
+
+
+def test_cache_and_callbacks():
+    master = MockMaster()
+    receiver = MavlinkReceiver(master, recv_timeout=0.05)
+    heartbeats = []
+    everything = []
+    receiver.add_callback('HEARTBEAT', heartbeats.append)
+    receiver.add_callback('*', everything.append)
+    receiver.start()
+
+    master.messages.put(MockMessage('HEARTBEAT', base_mode=0))
+    master.messages.put(MockMessage('BATTERY_STATUS', voltages=[12100]))
+    master.messages.put(MockMessage('BAD_DATA'))
+    master.messages.put(MockMessage('BATTERY_STATUS', voltages=[12000]))
+    time.sleep(0.2)
+    receiver.stop()
+
+    assert len(heartbeats) == 1
+    assert [msg.get_type() for msg in everything] == ['HEARTBEAT', 'BATTERY_STATUS', 'BATTERY_STATUS']
+    assert receiver.get('BATTERY_STATUS').voltages == [12000]
+    assert receiver.get('GLOBAL_POSITION_INT') is None
+    assert receiver.age('HEARTBEAT') < 1.0
+    # 只用阻塞方式读取所有类型
+    assert all(msg_type is None and blocking for msg_type, blocking in master.blocking)
+    print("[OK] 每条消息读取一次并按类型分发")
+
+
+def test_idle_does_not_spin():
+    master = MockMaster()
+    ticks = []
+    receiver = MavlinkReceiver(master, recv_timeout=0.1, on_tick=lambda: ticks.append(1))
+    receiver.start()
+    time.sleep(0.5)
+    receiver.stop()
+    # 空闲时每个recv_timeout才醒来一次
+    assert master.calls <= 7, master.calls
+    assert len(ticks) >= 3
+    print(f"[OK] 空闲0.5秒只调用recv_match {master.calls} 次")
+
+
+def test_callback_error_is_isolated():
+    master = MockMaster()
+    receiver = MavlinkReceiver(master, recv_timeout=0.05)
+
+    def broken(msg):
+        raise ValueError('boom')
+
+    received = []
+    receiver.add_callback('HEARTBEAT', broken)
+    receiver.add_callback('HEARTBEAT', received.append)
+    receiver.dispatch(MockMessage('HEARTBEAT'))
+    receiver.remove_callback('HEARTBEAT', received.append)
+    receiver.dispatch(MockMessage('HEARTBEAT'))
+    assert len(received) == 1
+    print("[OK] 回调异常不影响其他回调")
+
+
+if __name__ == "__main__":
+    print("开始MAVLink接收线程测试...")
+    print("=" * 50)
+
+    test_cache_and_callbacks()
+    test_idle_does_not_spin()
+    test_callback_error_is_isolated()
+
+    print("=" * 50)
+    print("MAVLink接收线程测试完成")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MAVLink固定频率发送线程测试脚本（不需要pymavlink和飞控）
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.mavlink_sender import MavlinkSender
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append((time.monotonic(), args))
+
+
+def test_setpoints_are_coalesced():
+    rc = Recorder()
+    sender = MavlinkSender(rate_hz=20, keepalive=10)
+    sender.start()
+    # 一个周期内的突发更新只发最新一个
+    for value in range(100):
+        sender.set_setpoint('rc', rc, value)
+    time.sleep(0.2)
+    # 相同的设定值不重复发送
+    for _ in range(20):
+        sender.set_setpoint('rc', rc, 99)
+        time.sleep(0.01)
+    sender.stop()
+
+    assert [args for _, args in rc.calls] == [(99,)], rc.calls
+    assert sender.coalesced >= 99
+    print(f"[OK] 120次更新只发送 {len(rc.calls)} 次")
+
+
+def test_keepalive_and_rate():
+    rc = Recorder()
+    sender = MavlinkSender(rate_hz=50, keepalive=0.1)
+    sender.start()
+    sender.set_setpoint('rc', rc, 1)
+    time.sleep(0.55)
+    sender.stop()
+    # 不变的设定值按keepalive重发
+    assert 4 <= len(rc.calls) <= 7, len(rc.calls)
+
+    rc = Recorder()
+    sender = MavlinkSender(rate_hz=20, keepalive=0)
+    sender.start()
+    start = time.monotonic()
+    while time.monotonic() - start < 0.5:
+        sender.set_setpoint('rc', rc, time.monotonic())
+        time.sleep(0.001)
+    sender.stop()
+    # 频率不随调用方变化
+    assert 8 <= len(rc.calls) <= 12, len(rc.calls)
+    print("[OK] 固定频率发送，不变时按keepalive重发")
+
+
+def test_priority_drops_setpoints():
+    rc = Recorder()
+    land = Recorder()
+    sender = MavlinkSender(rate_hz=5, keepalive=0)
+    sender.start()
+    time.sleep(0.05)
+    sender.set_setpoint('rc', rc, 1)
+    sender.send_priority(land, 'land')
+    time.sleep(0.4)
+    sender.stop()
+
+    assert land.calls and land.calls[0][1] == ('land',)
+    assert rc.calls == []
+    print("[OK] 紧急命令立即发送并丢弃待发设定值")
+
+
+if __name__ == "__main__":
+    print("开始MAVLink发送线程测试...")
+    print("=" * 50)
+
+    test_setpoints_are_coalesced()
+    test_keepalive_and_rate()
+    test_priority_drops_setpoints()
+
+    print("=" * 50)
+    print("MAVLink发送线程测试完成")
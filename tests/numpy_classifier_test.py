@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+NumPy分类器与TFLite模型一致性测试脚本
+
+tests/fixtures下的小模型（对称和非对称输入量化各一个）只需要NumPy；
+与解释器逐个比较和model目录下的模型需要TensorFlow，缺少时跳过。
+"""
+
+import sys
+import os
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+KEYPOINT_TFLITE = os.path.join(ROOT_DIR, 'model/keypoint_classifier/keypoint_classifier.tflite')
+KEYPOINT_CSV = os.path.join(ROOT_DIR, 'model/keypoint_classifier/keypoint.csv')
+POINT_HISTORY_TFLITE = os.path.join(ROOT_DIR, 'model/point_history_classifier/point_history_classifier.tflite')
+POINT_HISTORY_CSV = os.path.join(ROOT_DIR, 'model/point_history_classifier/point_history.csv')
+FIXTURE_DIR = os.path.join(ROOT_DIR, 'tests/fixtures')
+FIXTURE_NAMES = ('mlp_symmetric', 'mlp_asymmetric')
+
+
+def _builtin_interpreter(tf, tflite_path):
+    # XNNPACK会重新量化混合int8层的输入，与内置kernel结果不同
+    interpreter = tf.lite.Interpreter(
+        model_path=tflite_path,
+        experimental_op_resolver_type=tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def _check_parity(tflite_path, csv_path, feature_size):
+    try:
+        import numpy as np
+        import tensorflow as tf
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+    if not os.path.exists(tflite_path) or not os.path.exists(csv_path):
+        print(f"[SKIP] 缺少模型或数据: {tflite_path}")
+        return
+
+    from gestures.numpy_classifier import export_tflite_weights, NumpyMLPClassifier
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        npz_path = export_tflite_weights(tflite_path, os.path.join(tmp_dir, 'weights.npz'))
+        classifier = NumpyMLPClassifier(npz_path)
+
+        interpreter = _builtin_interpreter(tf, tflite_path)
+        input_index = interpreter.get_input_details()[0]['index']
+        output_index = interpreter.get_output_details()[0]['index']
+
+        features = np.loadtxt(csv_path, delimiter=',', dtype='float32',
+                              usecols=list(range(1, feature_size + 1)), ndmin=2)
+        max_diff = 0.0
+        for row in features:
+            interpreter.set_tensor(input_index, np.array([row]))
+            interpreter.invoke()
+            expected = np.squeeze(interpreter.get_tensor(output_index))
+            actual = classifier.predict_proba(row)
+
+            assert np.argmax(actual) == np.argmax(expected)
+            max_diff = max(max_diff, float(np.abs(actual - expected).max()))
+
+        # 只有softmax的exp实现不同，分类结果必须完全一致
+        assert max_diff < 1e-5, max_diff
+        del classifier
+
+    print(f"[OK] {tflite_path}: {len(features)} 个样本分类一致, 最大概率误差 {max_diff:.2e}")
+
+
+def test_weights_stay_memory_mapped():
+    """float和int8层都直接使用映射的数组，结果与逐层手算一致"""
+    try:
+        import numpy as np
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    from gestures.numpy_classifier import (NPZ_FORMAT, NumpyMLPClassifier,
+                                           _quantize_asymmetric, _quantize_symmetric)
+
+    rng = np.random.default_rng(0)
+    w0 = rng.normal(size=(42, 16)).astype(np.float32)
+    b0 = rng.normal(size=16).astype(np.float32)
+    w1 = rng.integers(-127, 128, size=(16, 8)).astype(np.int8)
+    w1_scale = rng.uniform(0.001, 0.01, size=8).astype(np.float32)
+    b1 = rng.normal(size=8).astype(np.float32)
+    w2 = rng.integers(-127, 128, size=(8, 4)).astype(np.int8)
+    w2_scale = rng.uniform(0.001, 0.01, size=4).astype(np.float32)
+    b2 = rng.normal(size=4).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        npz_path = os.path.join(tmp_dir, 'weights.npz')
+        np.savez(npz_path, format=np.array(NPZ_FORMAT), w0=w0, b0=b0,
+                 w1=w1, w1_scale=w1_scale, w1_asymmetric=np.array(False), b1=b1,
+                 w2=w2, w2_scale=w2_scale, w2_asymmetric=np.array(True), b2=b2)
+        classifier = NumpyMLPClassifier(npz_path)
+
+        for weight, scale, bias, row_sums in classifier.layers:
+            assert isinstance(weight, np.memmap) and isinstance(bias, np.memmap)
+        assert classifier.layers[1][0].dtype == np.int8
+        assert classifier.layers[1][3] is None
+        assert np.array_equal(classifier.layers[2][3], w2.astype(np.int32).sum(axis=0))
+
+        features = rng.normal(size=42).astype(np.float32)
+        hidden = np.maximum(features @ w0 + b0, 0)
+        quantized, input_scale = _quantize_symmetric(hidden)
+        hidden = b1 + (quantized @ w1.astype(np.int32)).astype(np.float32) * (input_scale * w1_scale)
+        hidden = np.maximum(hidden, 0)
+        quantized, input_scale, offset = _quantize_asymmetric(hidden)
+        # 零点展开前的形式：(q - offset) @ w
+        logits = b2 + ((quantized - offset) @ w2.astype(np.int32)).astype(np.float32) * (input_scale * w2_scale)
+        expected = np.exp(logits - logits.max())
+        expected /= expected.sum()
+        assert np.array_equal(classifier.predict_proba(features), expected)
+
+        # 旧格式（没有format或(units, in)布局）要求重新导出
+        np.savez(npz_path, w0=w0.T, b0=b0)
+        try:
+            NumpyMLPClassifier(npz_path)
+            assert False, "旧格式应当报错"
+        except ValueError:
+            pass
+        del classifier
+
+    print("[OK] 权重保持内存映射，不在加载时复制")
+
+
+def test_quantize_asymmetric():
+    try:
+        import numpy as np
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    from gestures.numpy_classifier import _quantize_asymmetric
+
+    # 范围总是包含0；全为正数时零点在-128
+    quantized, scale, offset = _quantize_asymmetric(np.array([0.5, 1.0, 2.0], dtype=np.float32))
+    assert offset == -128 and quantized.min() >= -128 and quantized.max() == 127
+    assert np.allclose((quantized - offset) * scale, [0.5, 1.0, 2.0], atol=scale)
+
+    quantized, scale, offset = _quantize_asymmetric(np.array([-1.0, 3.0], dtype=np.float32))
+    assert quantized.tolist() == [-128, 127] and offset == -64
+    assert np.allclose((quantized - offset) * scale, [-1.0, 3.0], atol=scale)
+
+    quantized, scale, offset = _quantize_asymmetric(np.zeros(4, dtype=np.float32))
+    assert not quantized.any() and offset == 0
+    print("[OK] 非对称量化的零点和范围")
+
+
+def test_fixture_parity():
+    """检入的小模型：与生成时记录的TFLite输出比较，不需要TensorFlow"""
+    try:
+        import numpy as np
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    from gestures.numpy_classifier import NumpyMLPClassifier
+
+    for name in FIXTURE_NAMES:
+        classifier = NumpyMLPClassifier(os.path.join(FIXTURE_DIR, name + '.npz'))
+        assert [weight.dtype for weight, _, _, _ in classifier.layers] == [np.int8, np.int8, np.float32]
+        expected = np.load(os.path.join(FIXTURE_DIR, name + '_expected.npz'))
+        max_diff = 0.0
+        for row, probabilities in zip(expected['features'], expected['probabilities']):
+            actual = classifier.predict_proba(row)
+            assert np.argmax(actual) == np.argmax(probabilities)
+            max_diff = max(max_diff, float(np.abs(actual - probabilities).max()))
+        assert max_diff < 1e-5, (name, max_diff)
+        del classifier
+        print(f"[OK] {name}: 与TFLite记录的输出一致, 最大概率误差 {max_diff:.2e}")
+
+
+def test_fixture_export():
+    """重新从检入的.tflite导出权重，逐个与解释器比较"""
+    try:
+        import numpy as np
+        import tensorflow as tf
+    except ImportError as e:
+        print(f"[SKIP] 缺少依赖: {e}")
+        return
+
+    from gestures.numpy_classifier import export_tflite_weights, NumpyMLPClassifier
+
+    for name in FIXTURE_NAMES:
+        tflite_path = os.path.join(FIXTURE_DIR, name + '.tflite')
+        features = np.load(os.path.join(FIXTURE_DIR, name + '_expected.npz'))['features']
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            npz_path = export_tflite_weights(tflite_path, os.path.join(tmp_dir, 'weights.npz'))
+            classifier = NumpyMLPClassifier(npz_path)
+            assert [bool(np.load(npz_path)[f'w{i}_asymmetric']) for i in range(2)] == \
+                [name == 'mlp_asymmetric'] * 2
+
+            interpreter = _builtin_interpreter(tf, tflite_path)
+            input_index = interpreter.get_input_details()[0]['index']
+            output_index = interpreter.get_output_details()[0]['index']
+            for row in features:
+                interpreter.set_tensor(input_index, row[np.newaxis])
+                interpreter.invoke()
+                expected = np.squeeze(interpreter.get_tensor(output_index))
+                assert np.abs(classifier.predict_proba(row) - expected).max() < 1e-5
+            del classifier
+    print("[OK] 从检入的.tflite导出后与解释器一致")
+
+
+def test_keypoint_classifier_parity():
+    _check_parity(KEYPOINT_TFLITE, KEYPOINT_CSV, 21 * 2)
+
+
+def test_point_history_classifier_parity():
+    _check_parity(POINT_HISTORY_TFLITE, POINT_HISTORY_CSV, 16 * 2)
+
+
+if __name__ == "__main__":
+    print("开始NumPy分类器一致性测试...")
+    print("=" * 50)
+
+    test_weights_stay_memory_mapped()
+    test_quantize_asymmetric()
+    test_fixture_parity()
+    test_fixture_export()
+    test_keypoint_classifier_parity()
+    test_point_history_classifier_parity()
+
+    print("=" * 50)
+    print("NumPy分类器一致性测试完成")
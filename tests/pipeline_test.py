@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+流水线阶段测试脚本
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pipeline import LatestQueue, PipelineStage
+
+
+def test_failing_source_backs_off():
+    """数据源一直出错时退避重试，不会空转"""
+    calls = []
+
+    def broken_source():
+        calls.append(time.monotonic())
+        raise RuntimeError("没有视频流")
+
+    stage = PipelineStage('capture', broken_source, poll_timeout=0.05, max_backoff=0.2)
+    stage.start()
+    time.sleep(0.6)
+    stage.stop()
+    stage.join(timeout=1)
+
+    # 0.05 + 0.1 + 0.2 + 0.2 ... 0.6秒内只调用几次
+    assert 3 <= len(calls) <= 6, len(calls)
+    assert stage.errors == len(calls)
+    print(f"[OK] 出错的数据源0.6秒内只重试 {len(calls)} 次")
+
+
+def test_backoff_resets_after_success():
+    results = iter([RuntimeError("a"), RuntimeError("b"), 1, 2])
+    output = LatestQueue(maxsize=4)
+
+    def flaky_source():
+        item = next(results, None)
+        if isinstance(item, Exception):
+            raise item
+        if item is None:
+            time.sleep(0.01)
+        return item
+
+    stage = PipelineStage('capture', flaky_source, output_queue=output, poll_timeout=0.01)
+    stage.start()
+    time.sleep(0.2)
+    stage.stop()
+    stage.join(timeout=1)
+
+    assert stage.errors == 0
+    assert [output.get(timeout=0), output.get(timeout=0)] == [1, 2]
+    print("[OK] 成功后退避计数清零")
+
+
+if __name__ == "__main__":
+    print("开始流水线测试...")
+    print("=" * 50)
+
+    test_failing_source_backs_off()
+    test_backoff_resets_after_success()
+
+    print("=" * 50)
+    print("流水线测试完成")
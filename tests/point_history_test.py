@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+指尖轨迹环形缓冲区测试脚本（只需要NumPy）
+"""
+
+import sys
+import os
+import copy
+import itertools
+from collections import deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from gestures.point_history import PointHistoryBuffer
+
+
+def _reference_normalized(point_history, image_width, image_height):
+    """原先基于deque的_pre_process_point_history"""
+    temp_point_history = copy.deepcopy(point_history)
+    base_x, base_y = 0, 0
+    for index, point in enumerate(temp_point_history):
+        if index == 0:
+            base_x, base_y = point[0], point[1]
+        temp_point_history[index][0] = (temp_point_history[index][0] - base_x) / image_width
+        temp_point_history[index][1] = (temp_point_history[index][1] - base_y) / image_height
+    return list(itertools.chain.from_iterable(temp_point_history))
+
+
+def test_wraparound():
+    buffer = PointHistoryBuffer(history_length=4)
+    assert len(buffer) == 0 and not buffer.is_full()
+    for i in range(1, 7):
+        buffer.append([i, i * 10])
+    # 只保留最近4个，从旧到新
+    assert buffer.is_full() and len(buffer) == 4
+    assert list(buffer) == [[3, 30], [4, 40], [5, 50], [6, 60]]
+    assert buffer.ordered().tolist() == list(buffer)
+    print("[OK] 环形缓冲区按时间顺序覆盖最旧的点")
+
+
+def test_pointer_count_after_eviction():
+    buffer = PointHistoryBuffer(history_length=3)
+    buffer.append([5, 5])
+    buffer.append([0, 0])
+    buffer.append([0, 0])
+    assert buffer.has_pointer()
+    # 唯一的指尖点被挤出窗口
+    buffer.append([0, 0])
+    assert not buffer.has_pointer()
+    buffer.append([0, 7])
+    assert buffer.has_pointer()
+    for _ in range(3):
+        buffer.append([0, 0])
+    assert not buffer.has_pointer()
+    buffer.clear()
+    assert len(buffer) == 0 and not buffer.has_pointer()
+    print("[OK] 淘汰后指尖点计数正确")
+
+
+def test_normalized_matches_deque():
+    rng = np.random.default_rng(0)
+    buffer = PointHistoryBuffer(history_length=16)
+    history = deque(maxlen=16)
+    assert buffer.normalized(960, 720).tolist() == _reference_normalized(history, 960, 720)
+    for _ in range(40):
+        # 一部分帧没有指尖（[0, 0]）
+        point = [0, 0] if rng.random() < 0.3 else rng.integers(0, 960, size=2).tolist()
+        buffer.append(point)
+        history.append(point)
+        assert buffer.normalized(960, 720).tolist() == _reference_normalized(history, 960, 720)
+    print("[OK] normalized()与原deque实现一致")
+
+
+if __name__ == "__main__":
+    print("开始指尖轨迹缓冲区测试...")
+    print("=" * 50)
+
+    test_wraparound()
+    test_pointer_count_after_eviction()
+    test_normalized_matches_deque()
+
+    print("=" * 50)
+    print("指尖轨迹缓冲区测试完成")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+入口导入耗时测试脚本
+
+在新的解释器中导入main，检查import main的耗时不超过预算(环境变量IMPORT_BUDGET_MS，默认300ms)，
+并且没有提前加载cv2、mediapipe、TensorFlow和无人机SDK。
+只测量入口模块的导入，不包括之后与无人机连接并行进行的模型加载和预热。
+"""
+
+import sys
+import os
+import importlib.util
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.startup_profile import measure_imports, parse_importtime, total_import_ms
+
+
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 300))
+HEAVY_MODULES = ['cv2', 'mediapipe', 'tensorflow', 'tflite_runtime', 'djitellopy', 'pymavlink', 'numpy']
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 | encodings
+import time:        40 |         40 |     encodings.aliases
+import time:       500 |        500 |   encodings.utf_8
+import time:      1000 |       1000 | site
+import time:        80 |         80 |       utils.startup_profile
+import time:      2000 |       2080 |   utils
+import time:      3000 |      52000 | main
+"""
+
+
+def _import_main():
+    if importlib.util.find_spec('configargparse') is None:
+        print("[SKIP] 缺少依赖: configargparse")
+        return None
+    return measure_imports('main')
+
+
+def test_heavy_modules_are_lazy():
+    measured = _import_main()
+    if measured is None:
+        return
+    _, loaded = measured
+    eager = [name for name in HEAVY_MODULES if name in loaded]
+    assert not eager, f"启动时加载了: {eager}"
+    print("[OK] 启动时未加载重量级模块")
+
+
+def test_parse_importtime():
+    entries = parse_importtime(IMPORTTIME_SAMPLE)
+    assert len(entries) == 8
+    assert entries[0] == ('  _io', 120, 120)
+    assert entries[1] == ('encodings', 300, 900)
+    assert entries[6] == ('  utils', 2000, 2080)
+    # 只累加顶层导入，嵌套导入已包含在上层的cumulative中
+    assert total_import_ms(entries) == 53.9
+    assert total_import_ms(entries, 'main') == 52.0
+    assert total_import_ms(entries, 'utils') == 0
+    print("[OK] importtime输出解析正确，只统计顶层导入")
+
+
+def test_import_budget():
+    measured = _import_main()
+    if measured is None:
+        return
+    entries, _ = measured
+    total_ms = total_import_ms(entries, 'main')
+    assert total_ms <= IMPORT_BUDGET_MS, f"import main 耗时 {total_ms:.1f} ms, 超过预算 {IMPORT_BUDGET_MS:.0f} ms"
+    print(f"[OK] import main 耗时 {total_ms:.1f} ms (预算 {IMPORT_BUDGET_MS:.0f} ms)")
+
+
+if __name__ == "__main__":
+    print("开始入口导入耗时测试...")
+    print("=" * 50)
+
+    test_parse_importtime()
+    test_heavy_modules_are_lazy()
+    test_import_budget()
+
+    print("=" * 50)
+    print("入口导入耗时测试完成")
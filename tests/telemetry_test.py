@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+遥测缓存测试脚本（不需要飞机）
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.telemetry import TelemetryCache
+
+
+class MockDrone:
+    def __init__(self, heartbeat=None):
+        self.battery = 80
+        self.heartbeat = heartbeat
+        self.battery_calls = 0
+
+    def get_battery(self):
+        self.battery_calls += 1
+        if self.battery is None:
+            raise IOError("链路断开")
+        return str(self.battery)
+
+    def get_mode(self):
+        return "POSCTL"
+
+    def is_armed(self):
+        return True
+
+    def get_last_heartbeat(self):
+        return self.heartbeat
+
+
+def test_poll_updates_cache():
+    drone = MockDrone(heartbeat=time.time() - 2.0)
+    telemetry = TelemetryCache(drone, poll_interval=1.0)
+    assert telemetry.battery == "N/A" and not telemetry.is_fresh()
+
+    telemetry.poll()
+    assert (telemetry.battery, telemetry.mode, telemetry.armed) == ("80", "POSCTL", True)
+    assert 1.9 <= telemetry.heartbeat_age() <= 2.5
+
+    # 读取缓存不访问无人机
+    for _ in range(100):
+        assert telemetry.battery == "80"
+    assert drone.battery_calls == 1
+
+    # 读取失败时显示N/A，其余字段照常更新
+    drone.battery = None
+    telemetry.poll()
+    assert telemetry.battery == "N/A" and telemetry.mode == "POSCTL"
+    print("[OK] poll()更新缓存")
+
+
+def test_ttl_and_heartbeat_age():
+    telemetry = TelemetryCache(MockDrone(), poll_interval=1.0)
+    # 默认有效期为3倍轮询间隔
+    assert telemetry.ttl == 3.0
+    telemetry.poll()
+    assert telemetry.is_fresh()
+    telemetry.updated_at -= 3.5
+    assert not telemetry.is_fresh()
+
+    # 不支持心跳的无人机
+    assert telemetry.heartbeat_age() is None
+
+    telemetry = TelemetryCache(MockDrone(), poll_interval=1.0, ttl=0.5)
+    telemetry.poll()
+    telemetry.updated_at -= 0.6
+    assert not telemetry.is_fresh()
+    print("[OK] 缓存有效期和心跳间隔")
+
+
+def test_background_polling():
+    drone = MockDrone()
+    telemetry = TelemetryCache(drone, poll_interval=0.05)
+    telemetry.start()
+    time.sleep(0.22)
+    telemetry.stop()
+    calls = drone.battery_calls
+    assert 3 <= calls <= 6, calls
+    time.sleep(0.1)
+    # 停止后不再轮询
+    assert drone.battery_calls == calls
+    assert telemetry.is_fresh()
+    print(f"[OK] 后台线程轮询 {calls} 次")
+
+
+if __name__ == "__main__":
+    print("开始遥测缓存测试...")
+    print("=" * 50)
+
+    test_poll_updates_cache()
+    test_ttl_and_heartbeat_age()
+    test_background_polling()
+
+    print("=" * 50)
+    print("遥测缓存测试完成")
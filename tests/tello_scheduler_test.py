@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tello指令调度测试脚本（不需要djitellopy和飞机）
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drones.tello_scheduler import TelloCommandScheduler
+
+
+class MockTello:
+    """阻塞指令耗时command_time，模拟等待ok回复"""
+
+    def __init__(self, command_time=0.1):
+        self.command_time = command_time
+        self.commands = []
+        self.rc = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _blocking(self, name, *args):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.command_time)
+        with self._lock:
+            self.in_flight -= 1
+        self.commands.append((name,) + args)
+
+    def move_forward(self, distance):
+        self._blocking('move_forward', distance)
+
+    def land(self):
+        self._blocking('land')
+
+    def send_rc_control(self, *values):
+        self.rc.append(values)
+
+
+def test_latest_wins():
+    tello = MockTello()
+    scheduler = TelloCommandScheduler()
+    scheduler.start()
+    start = time.monotonic()
+    # 按住按键：每帧都请求一次移动
+    for distance in range(1, 31):
+        scheduler.submit(tello.move_forward, distance)
+        time.sleep(0.01)
+    elapsed = time.monotonic() - start
+    scheduler.stop(timeout=2)
+
+    # 调用方不被阻塞，只执行了正在执行的和最后一个
+    assert elapsed < 0.6, elapsed
+    assert tello.max_in_flight == 1
+    assert len(tello.commands) <= 8, tello.commands
+    assert tello.commands[-1] == ('move_forward', 30)
+    print(f"[OK] 30次请求只执行 {len(tello.commands)} 次，最后一次生效")
+
+
+def test_sticky_land_is_not_replaced():
+    tello = MockTello()
+    scheduler = TelloCommandScheduler()
+    scheduler.start()
+    scheduler.submit(tello.move_forward, 20)
+    time.sleep(0.02)
+    scheduler.submit(tello.land, sticky=True)
+    assert not scheduler.submit(tello.move_forward, 30)
+    # stop等待排队的land执行完
+    scheduler.stop(timeout=2)
+    assert tello.commands == [('move_forward', 20), ('land',)]
+    # 被拒绝的请求不算作替换
+    assert scheduler.dropped == 0
+    print("[OK] land不会被后来的移动替换，退出前执行完")
+
+
+def test_rc_lane_is_rate_limited():
+    tello = MockTello(command_time=0.3)
+    scheduler = TelloCommandScheduler(rc_rate=20)
+    scheduler.start()
+    scheduler.submit(tello.move_forward, 20)
+    start = time.monotonic()
+    while time.monotonic() - start < 0.5:
+        scheduler.send_rc(tello.send_rc_control, 0, 1 + int((time.monotonic() - start) * 100), 0, 0)
+        time.sleep(0.002)
+    scheduler.send_rc(tello.send_rc_control, 0, 0, 0, 0)
+    time.sleep(0.1)
+    # 不变的值在rc_keepalive=0时不重发
+    scheduler.send_rc(tello.send_rc_control, 0, 0, 0, 0)
+    time.sleep(0.1)
+    scheduler.stop(timeout=2)
+
+    # 阻塞指令执行期间RC照常发送，频率受限，最后的停止指令一定发出
+    assert 8 <= len(tello.rc) <= 13, len(tello.rc)
+    assert tello.rc[-1] == (0, 0, 0, 0)
+    print(f"[OK] 0.5秒内RC只发送 {len(tello.rc)} 次")
+
+
+def test_rc_keepalive_resends_unchanged_value():
+    tello = MockTello()
+    scheduler = TelloCommandScheduler(rc_rate=20, rc_keepalive=0.1)
+    scheduler.start()
+    # 持续同一个手势：每帧都给出相同的RC值
+    start = time.monotonic()
+    while time.monotonic() - start < 0.55:
+        scheduler.send_rc(tello.send_rc_control, 0, 20, 0, 0)
+        time.sleep(0.01)
+    scheduler.stop(timeout=2)
+
+    # 首次发送加上每0.1秒一次的重发，链路不会因为没有指令而超时
+    assert all(values == (0, 20, 0, 0) for values in tello.rc)
+    assert 4 <= len(tello.rc) <= 7, len(tello.rc)
+    print(f"[OK] 不变的RC值0.55秒内按keepalive发送 {len(tello.rc)} 次")
+
+
+def test_query_never_overlaps_commands():
+    """电池查询和阻塞指令不会同时在途"""
+    tello = MockTello(command_time=0.1)
+
+    def get_battery():
+        tello._blocking('battery?')
+        return 87
+
+    scheduler = TelloCommandScheduler()
+    scheduler.start()
+    scheduler.submit(tello.move_forward, 20)
+    time.sleep(0.02)
+    # 移动执行中：不发送查询
+    assert scheduler.try_query(get_battery) == (False, None)
+    scheduler.wait_idle(1)
+    assert scheduler.try_query(get_battery) == (True, 87)
+
+    # 查询执行期间提交的指令等查询结束后才执行
+    query = threading.Thread(target=scheduler.try_query, args=(get_battery,))
+    query.start()
+    time.sleep(0.02)
+    scheduler.submit(tello.move_forward, 30)
+    query.join()
+    scheduler.stop(timeout=2)
+
+    assert tello.max_in_flight == 1
+    assert tello.commands == [('move_forward', 20), ('battery?',), ('battery?',), ('move_forward', 30)]
+    print("[OK] 查询与阻塞指令互斥")
+
+
+if __name__ == "__main__":
+    print("开始Tello指令调度测试...")
+    print("=" * 50)
+
+    test_latest_wins()
+    test_sticky_land_is_not_replaced()
+    test_rc_lane_is_rate_limited()
+    test_rc_keepalive_resends_unchanged_value()
+    test_query_never_overlaps_commands()
+
+    print("=" * 50)
+    print("Tello指令调度测试完成")
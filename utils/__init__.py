@@ -1 +1,27 @@
-from utils.cvfpscalc import CvFpsCalc
\ No newline at end of file
+# 按需导入，避免在包初始化时加载cv2
+__all__ = [
+    'CvFpsCalc',
+    'LatestQueue',
+    'PipelineStage',
+    'FramePool',
+    'ConsoleKeyReader'
+]
+
+def __getattr__(name):
+    if name == 'CvFpsCalc':
+        from utils.cvfpscalc import CvFpsCalc
+        return CvFpsCalc
+    elif name == 'LatestQueue':
+        from utils.pipeline import LatestQueue
+        return LatestQueue
+    elif name == 'PipelineStage':
+        from utils.pipeline import PipelineStage
+        return PipelineStage
+    elif name == 'FramePool':
+        from utils.frame_pool import FramePool
+        return FramePool
+    elif name == 'ConsoleKeyReader':
+        from utils.console_input import ConsoleKeyReader
+        return ConsoleKeyReader
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
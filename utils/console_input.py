@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+import atexit
+import threading
+from collections import deque
+
+try:
+    import select
+    import termios
+    import tty
+    TERMIOS_AVAILABLE = True
+except ImportError:
+    TERMIOS_AVAILABLE = False
+
+ESC = 0x1b
+# 按行读取时整段删除的转义序列：CSI(ESC [ ... 终止符)、SS3(ESC O x)和Alt组合键(ESC x)
+_ESCAPE_SEQUENCE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|O.|[^\x1b])')
+
+
+class ConsoleKeyReader(object):
+    """无界面模式下从终端读取按键，代替cv.waitKey
+
+    终端支持时切换到cbreak模式逐字符读取，否则按行读取（回车后生效）。
+    read_key()的返回值与cv.waitKey(1) & 0xff一致，没有按键时返回255。
+    方向键、功能键等以ESC开头的转义序列整段丢弃，ESC之后escape_timeout秒内
+    没有其他字节才算作ESC键(27)，误按方向键不会触发退出。
+    终端设置在stop()或进程退出时恢复。
+    """
+
+    NO_KEY = 255
+    ESCAPE_TIMEOUT = 0.05
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdin
+        self._keys = deque()
+        self._cond = threading.Condition()
+        self._old_attrs = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if TERMIOS_AVAILABLE and self._stream.isatty():
+            fd = self._stream.fileno()
+            self._old_attrs = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            # 异常退出时也恢复终端
+            atexit.register(self.stop)
+        self._thread = threading.Thread(target=self._read_loop, name='console-keys', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # 读取线程阻塞在stdin上，作为守护线程随进程退出，这里只恢复终端设置
+        if self._old_attrs is not None:
+            termios.tcsetattr(self._stream.fileno(), termios.TCSADRAIN, self._old_attrs)
+            self._old_attrs = None
+            atexit.unregister(self.stop)
+
+    def _read_loop(self):
+        while True:
+            if self._old_attrs is not None:
+                keys = self._read_cbreak()
+            else:
+                keys = self._read_line()
+            if keys is None:  # EOF
+                return
+            if not keys:
+                continue
+            with self._cond:
+                self._keys.extend(keys)
+                self._cond.notify()
+
+    def _read_byte(self, timeout=None):
+        """读取一个字节，超时或EOF返回None"""
+        try:
+            fd = self._stream.fileno()
+            if timeout is not None and not select.select([fd], [], [], timeout)[0]:
+                return None
+            data = os.read(fd, 1)
+        except (OSError, ValueError):
+            # 终端已关闭，按EOF处理
+            return None
+        return data[0] if data else None
+
+    def _read_cbreak(self):
+        byte = self._read_byte()
+        if byte is None:
+            return None
+        if byte >= 0x80:
+            # 非ASCII字符的字节，和按键码无关
+            return []
+        if byte != ESC:
+            return [byte]
+        return [] if skip_escape_sequence(lambda: self._read_byte(self.ESCAPE_TIMEOUT)) else [ESC]
+
+    def _read_line(self):
+        line = self._stream.readline()
+        if not line:
+            return None
+        line = _ESCAPE_SEQUENCE.sub('', line.rstrip('\n'))
+        return [ord(char) & 0xff for char in line]
+
+    def read_key(self, timeout=0.0):
+        """取出下一个按键码，超时返回255"""
+        with self._cond:
+            if not self._keys and timeout:
+                self._cond.wait(timeout)
+            if not self._keys:
+                return self.NO_KEY
+            return self._keys.popleft()
+
+
+def skip_escape_sequence(read_byte):
+    """ESC之后读掉转义序列的其余部分
+
+    read_byte()返回下一个字节，超时返回None。ESC之后马上没有字节时是单独的ESC键，
+    返回False；否则读到序列结束（或超时）为止并返回True。
+    """
+    byte = read_byte()
+    if byte is None:
+        return False
+    if byte == ord('['):
+        # CSI：参数和中间字节之后以0x40-0x7E结束，如ESC [ A、ESC [ 1 5 ~
+        while True:
+            byte = read_byte()
+            if byte is None or 0x40 <= byte <= 0x7e:
+                return True
+    if byte == ord('O'):
+        # SS3：F1-F4和部分终端的方向键，ESC O P
+        read_byte()
+    return True
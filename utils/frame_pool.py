@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+
+
+class FramePool(object):
+    """预分配帧缓冲区的空闲列表
+
+    acquire()从空闲列表取一个缓冲区，没有空闲的就新分配一个；用完的帧
+    （显示完毕或被队列丢弃）通过release()归还。只有空闲列表里的缓冲区会被
+    再次交出，仍在绘制或显示的帧不会被覆盖。
+    """
+
+    def __init__(self, size=5, dtype=np.uint8):
+        self.size = size
+        self.dtype = dtype
+        self._shape = None
+        self._free = []
+        self._lock = threading.Lock()
+        # 统计：空闲列表为空时新分配的次数
+        self.allocated = 0
+
+    def reset(self, shape):
+        """按新的帧尺寸预分配size个缓冲区，旧尺寸的缓冲区不再回收"""
+        shape = tuple(shape)
+        with self._lock:
+            self._shape = shape
+            self._free = [np.empty(shape, dtype=self.dtype) for _ in range(self.size)]
+
+    def acquire(self, shape):
+        shape = tuple(shape)
+        with self._lock:
+            if shape == self._shape and self._free:
+                return self._free.pop()
+            self.allocated += 1
+        return np.empty(shape, dtype=self.dtype)
+
+    def release(self, frame):
+        """归还一帧；尺寸不符、已经归还过或空闲列表已满时直接丢弃"""
+        if not isinstance(frame, np.ndarray):
+            return
+        with self._lock:
+            if frame.shape != self._shape or frame.dtype != self.dtype or len(self._free) >= self.size:
+                return
+            if any(frame is free for free in self._free):
+                return
+            self._free.append(frame)
+
+    def free_count(self):
+        with self._lock:
+            return len(self._free)
@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+
+
+class LatestQueue(object):
+    """有界队列：满时丢弃最旧的元素，消费者总是拿到最新数据
+
+    on_drop(item)在元素被丢弃时调用（在锁外），用于归还元素占用的缓冲区。
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        dropped = None
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                dropped = self._items[0]
+            self._items.append(item)
+            self._cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        """取出最旧的未消费元素，超时返回None"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+        if self.on_drop is not None:
+            for item in items:
+                self.on_drop(item)
+
+
+class PipelineStage(threading.Thread):
+    """流水线阶段：在独立线程中从输入队列取数据，处理后写入输出队列
+
+    没有输入队列的阶段作为数据源，循环调用func()。
+    func返回None表示本次没有产出。
+    func连续出错时等待时间从poll_timeout开始翻倍，最长max_backoff秒，
+    成功一次后恢复，出错的数据源不会占满一个CPU核刷屏。
+    """
+
+    def __init__(self, name, func, input_queue=None, output_queue=None, poll_timeout=0.1,
+                 max_backoff=2.0):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.poll_timeout = poll_timeout
+        self.max_backoff = max_backoff
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.input_queue is not None:
+                    item = self.input_queue.get(timeout=self.poll_timeout)
+                    if item is None:
+                        continue
+                    result = self.func(item)
+                else:
+                    result = self.func()
+            except Exception as e:
+                self.errors += 1
+                backoff = min(self.poll_timeout * 2 ** (self.errors - 1), self.max_backoff)
+                print(f"{self.name} 阶段错误 (连续第{self.errors}次，{backoff:.1f}秒后重试): {e}")
+                self._stop_event.wait(backoff)
+                continue
+
+            self.errors = 0
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Cold-start import-time report for the entry point
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+prints the slowest imports by cumulative time, so the numbers do not depend
+on what the current process has already loaded.
+
+    python -m utils.startup_profile
+    python -m utils.startup_profile --module main --top 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module='main', python=sys.executable):
+    """Imports `module` in a new interpreter
+
+    Returns:
+        (entries, loaded) where entries is [(module, self_us, cumulative_us)]
+        in import order and loaded is the set of modules in sys.modules
+        after the import.
+    """
+    code = "import sys, {}; print(','.join(sorted(sys.modules)))".format(module)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    process = subprocess.run([python, '-X', 'importtime', '-c', code], cwd=ROOT_DIR, env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if process.returncode != 0:
+        raise RuntimeError("导入 {} 失败:\n{}".format(module, process.stderr.strip().splitlines()[-1:]))
+
+    entries = parse_importtime(process.stderr)
+    loaded = set(process.stdout.strip().splitlines()[-1].split(','))
+    return entries, loaded
+
+
+def parse_importtime(text):
+    """Parses `-X importtime` output into [(module, self_us, cumulative_us)]
+
+    The module name keeps its indentation from the import tree (two spaces
+    per nesting level), so top-level imports are the names without leading
+    spaces.
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # drop the single space after the separator, keep the tree indentation
+        name = name.rstrip()
+        if name.startswith(' '):
+            name = name[1:]
+        entries.append((name, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def total_import_ms(entries, module=None):
+    """Cumulative time of the top-level imports, or only of `module` if given
+
+    Nested imports are already included in their parent's cumulative time.
+    """
+    return sum(cumulative for name, _, cumulative in entries
+               if not name.startswith(' ') and (module is None or name == module)) / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start import-time report')
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    entries, _ = measure_imports(args.module)
+    print("{:>12}{:>12}  {}".format('self ms', 'cumul ms', 'module'))
+    for name, self_us, cumulative_us in sorted(entries, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print("{:>12.1f}{:>12.1f}  {}".format(self_us / 1000.0, cumulative_us / 1000.0, name.strip()))
+    print("import {} 总耗时: {:.1f} ms".format(args.module, total_import_ms(entries, args.module)))
+
+
+if __name__ == '__main__':
+    main()